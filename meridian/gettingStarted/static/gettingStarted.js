@@ -0,0 +1,34 @@
+window.addEventListener('DOMContentLoaded', () => {
+    const hash = window.location.hash; // e.g. "#52week"
+    if (hash) {
+      const id = hash.substring(1);
+      const term = document.getElementById(id);
+      if (term) {
+        const glossaryTerm = term.closest('.glossary-term');
+        if (glossaryTerm) {
+          glossaryTerm.classList.add('open');
+        }
+      }
+    }
+  });
+
+function toggleGlossary(el) {
+  el.classList.toggle('open');
+}
+
+// Highlight active section in progress nav on scroll
+const sections = document.querySelectorAll('.gs-section');
+const pills    = document.querySelectorAll('.progress-pill');
+
+const observer = new IntersectionObserver(entries => {
+  entries.forEach(entry => {
+    if (entry.isIntersecting) {
+      const id = entry.target.id;
+      pills.forEach(p => {
+        p.classList.toggle('active', p.getAttribute('href') === `#${id}`);
+      });
+    }
+  });
+}, { threshold: 0.3 });
+
+sections.forEach(s => observer.observe(s));
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from leaderboard import services
+
+
+class Command(BaseCommand):
+    help = 'Mark every portfolio to market and re-score the leaderboard in one batch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--every', type=int, metavar='SECONDS',
+                            help='Keep running, refreshing on this interval')
+
+    def handle(self, *args, **options):
+        while True:
+            start = time.perf_counter()
+            touched = services.refresh_all(batch_size=options['batch_size'])
+            elapsed = time.perf_counter() - start
+            self.stdout.write(self.style.SUCCESS(
+                f'Updated {touched} leaderboard entries in {elapsed:.2f}s'))
+            if not options['every']:
+                break
+            time.sleep(options['every'])
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 02:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaderboard', '0002_alter_leaderboard_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='leaderboard',
+            name='score',
+            field=models.DecimalField(db_index=True, decimal_places=2, max_digits=10),
+        ),
+    ]
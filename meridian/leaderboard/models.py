@@ -3,7 +3,7 @@ from login.models import Profile
 
 class Leaderboard(models.Model):
     profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='leaderboard_entries')
-    score = models.DecimalField(max_digits=10, decimal_places=2)  # mirrors Profile.balance
+    score = models.DecimalField(max_digits=10, decimal_places=2, db_index=True)  # mirrors Profile.balance
     
     class Meta:
         ordering = ['-score']  # order descending
@@ -0,0 +1,104 @@
+"""
+Keeps Leaderboard scores in step with each user's total equity.
+
+A score is cash plus every open position marked to market. The
+refresh_leaderboard batch job syncs each held ticker's daily bars into the
+shared PriceBar table once and values all users together with pandas;
+trades re-score just the trader from the latest stored closes, which every
+process sees. Scores are never written on page views.
+
+The top-N rows are cached and the cache is dropped whenever a score
+changes. That only reaches other processes with a shared cache backend
+(REDIS_URL); otherwise each worker's copy expires after LEADERBOARD_TOP_TTL.
+"""
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from login.models import Profile
+from stocks import history_store
+from stocks.models import Position
+from .models import Leaderboard
+
+
+TOP_N = 10
+TOP_CACHE_KEY = 'leaderboard:top:{n}'
+TOP_CACHE_TTL = getattr(settings, 'LEADERBOARD_TOP_TTL', 5 * 60)
+
+
+def invalidate():
+    cache.delete(TOP_CACHE_KEY.format(n=TOP_N))
+
+
+def top_entries(n=TOP_N):
+    key = TOP_CACHE_KEY.format(n=n)
+    entries = cache.get(key)
+    if entries is None:
+        entries = list(Leaderboard.objects.select_related('profile__user')[:n])
+        cache.set(key, entries, TOP_CACHE_TTL)
+    return entries
+
+
+def update_score(user_id):
+    """
+    Re-score one user after a trade. Positions are valued at their latest
+    stored close (falling back to average cost), so this never calls
+    upstream and is safe to run inside the trade's transaction.
+    """
+    profile = Profile.objects.filter(user_id=user_id).only('id', 'balance').first()
+    if profile is None:
+        return
+    positions = list(Position.objects.filter(user_id=user_id, shares__gt=0))
+    marks = history_store.last_closes([p.ticker for p in positions])
+    equity = profile.balance + sum(p.shares * marks.get(p.ticker, p.avg_price) for p in positions)
+    updated = Leaderboard.objects.filter(profile=profile).update(score=round(equity, 2))
+    if not updated:
+        Leaderboard.objects.create(profile=profile, score=round(equity, 2))
+    transaction.on_commit(invalidate)
+
+
+def _latest_prices(tickers):
+    # syncs the shared bar store, so trades in any process price from the same closes
+    series = history_store.get_many(tickers)
+    return pd.Series({t: s.last_close for t, s in series.items() if len(s)}, dtype=float)
+
+
+def compute_scores():
+    """Equity per profile id, with every held ticker priced exactly once."""
+    positions = pd.DataFrame.from_records(
+        Position.objects.filter(shares__gt=0).values_list('user_id', 'ticker', 'shares', 'cost_basis'),
+        columns=['user_id', 'ticker', 'shares', 'cost_basis'],
+    )
+    profiles = pd.DataFrame.from_records(
+        Profile.objects.values_list('id', 'user_id', 'balance'),
+        columns=['profile_id', 'user_id', 'balance'],
+    )
+
+    prices = _latest_prices(positions['ticker'].unique().tolist()) if len(positions) else pd.Series(dtype=float)
+
+    # unpriced tickers are carried at cost rather than counted as worthless
+    mark = positions['ticker'].map(prices)
+    positions['value'] = (positions['shares'] * mark).fillna(positions['cost_basis'])
+    equity = positions.groupby('user_id')['value'].sum()
+
+    profiles['score'] = (profiles['balance'] + profiles['user_id'].map(equity).fillna(0)).round(2)
+    return profiles.set_index('profile_id')['score']
+
+
+def refresh_all(batch_size=1000):
+    """Re-score every profile with bulk writes. Returns the number of rows touched."""
+    scores = compute_scores()
+    entries = {e.profile_id: e for e in Leaderboard.objects.only('id', 'profile_id', 'score')}
+    changed, missing = [], []
+    for profile_id, score in scores.items():
+        entry = entries.get(profile_id)
+        if entry is None:
+            missing.append(Leaderboard(profile_id=profile_id, score=score))
+        elif float(entry.score) != score:
+            entry.score = score
+            changed.append(entry)
+    Leaderboard.objects.bulk_update(changed, ['score'], batch_size=batch_size)
+    Leaderboard.objects.bulk_create(missing, batch_size=batch_size)
+    invalidate()
+    return len(changed) + len(missing)
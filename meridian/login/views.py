@@ -1,6 +1,7 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
+from leaderboard import services as leaderboard
 from .models import Profile
 
 def register_view(request):
@@ -11,6 +12,7 @@ def register_view(request):
             return render(request, 'login/register.html', {'error': 'Username taken'})
         user = User.objects.create_user(username=username, password=password)
         Profile.objects.create(user=user)
+        leaderboard.update_score(user.pk)
         login(request, user)
         return redirect('/stocks/')
     return render(request, 'login/register.html')
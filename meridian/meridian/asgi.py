@@ -3,6 +3,10 @@ ASGI config for meridian project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the project through this entry point (e.g. ``uvicorn meridian.asgi:application``)
+so /stocks/api/stream/<ticker>/ can hold many open event streams on one
+event loop instead of one worker thread each.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
@@ -14,3 +18,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meridian.settings')
 
 application = get_asgi_application()
+
+# keep prices for held and popular tickers warm in this worker (PREWARM_PRICES)
+from stocks import prewarm  # noqa: E402
+prewarm.start()
@@ -50,7 +50,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'stocks.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'stocks.middleware.StaticFilesMiddleware',  # WhiteNoise, kept async under ASGI
+    'stocks.middleware.GZipMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -82,12 +86,45 @@ WSGI_APPLICATION = 'meridian.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=postgres switches to PostgreSQL (DB_NAME, DB_USER, DB_PASSWORD,
+# DB_HOST, DB_PORT). Both keep connections open for DB_CONN_MAX_AGE seconds.
+
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', 60))
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DB_NAME', 'meridian'),
+            'USER': os.getenv('DB_USER', ''),
+            'PASSWORD': os.getenv('DB_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', ''),
+            'PORT': os.getenv('DB_PORT', ''),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            # re-check a reused connection before each request's first query
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {'connect_timeout': 5},
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'OPTIONS': {
+                # WAL lets readers carry on while a trade is being written;
+                # NORMAL only fsyncs at checkpoints, which is safe under WAL.
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+                # busy_timeout: wait up to this many seconds for the write lock
+                'timeout': 20,
+                # take the write lock at BEGIN, so two trades can't deadlock
+                # upgrading from a read lock
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
     }
-}
 
 
 # Password validation
@@ -125,3 +162,124 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# collectstatic writes content-hashed copies plus .gz/.br siblings;
+# WhiteNoise serves the hashed ones with a far-future immutable
+# Cache-Control, so repeat visits never re-download CSS/JS.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'meridian.storage.StaticStorage'},
+}
+WHITENOISE_MAX_AGE = 60 * 60  # for the few unhashed files
+
+
+# Django cache (leaderboard top-N). Set REDIS_URL so every worker and the
+# refresh_leaderboard command share it; the default LocMemCache is per
+# process, so score changes only show up elsewhere once
+# LEADERBOARD_TOP_TTL runs out.
+
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        },
+    }
+LEADERBOARD_TOP_TTL = 5 * 60 if os.getenv('REDIS_URL') else 30
+
+# Market data cache (stocks/market_data.py)
+# TTLs are in seconds and keyed by 'info', 'intraday', 'history' or 'history:<period>'.
+
+MARKET_DATA_TTLS = {}
+MARKET_DATA_MAX_ENTRIES = 512
+
+# Where market data comes from (stocks/backends.py). Set
+# MARKET_DATA_BACKEND=stocks.backends.LocalBackend to run offline on
+# recorded fixtures and seeded synthetic prices, e.g. for benchmarks.
+
+MARKET_DATA_BACKEND = os.getenv('MARKET_DATA_BACKEND', 'stocks.backends.YFinanceBackend')
+MARKET_DATA_BACKEND_OPTIONS = {}
+if MARKET_DATA_BACKEND.endswith('LocalBackend'):
+    MARKET_DATA_BACKEND_OPTIONS = {
+        'fixtures_dir': os.getenv('MARKET_DATA_FIXTURES') or None,
+        'seed': int(os.getenv('MARKET_DATA_SEED', 0)),
+        'latency': float(os.getenv('MARKET_DATA_LATENCY', 0)),
+        'jitter': float(os.getenv('MARKET_DATA_JITTER', 0)),
+    }
+
+# Upstream deadlines, hedging and circuit breakers (stocks/resilience.py)
+# Seconds. A read slower than UPSTREAM_HEDGE_AFTER gets one duplicate; a
+# host failing UPSTREAM_BREAKER_FAILURES times in a row is skipped for
+# UPSTREAM_BREAKER_RESET seconds, and views serve last known prices.
+
+UPSTREAM_DEADLINE = 5.0
+UPSTREAM_BULK_DEADLINE = 20.0
+UPSTREAM_HEDGE_AFTER = 1.5
+UPSTREAM_BREAKER_FAILURES = 5
+UPSTREAM_BREAKER_RESET = 30.0
+UPSTREAM_MAX_WORKERS = 32
+
+# Local daily-bar store (stocks/history_store.py)
+
+HISTORY_STORE_BACKFILL = '2y'
+HISTORY_STORE_SYNC_TTL = 15 * 60
+HISTORY_STORE_STALE_RETRY = 30
+
+# OHLC candle pyramid (stocks/candles.py)
+# Hourly candles cover the last CANDLES_INTRADAY_PERIOD of 15-minute bars;
+# daily, weekly and monthly ones the whole local daily-bar store.
+
+CANDLES_INTRADAY_PERIOD = '1mo'
+CANDLES_TTL = 5 * 60
+CANDLES_MAX_TICKERS = 128
+
+# AI stock stories (stocks/story.py)
+
+STORY_CACHE_TTL = 6 * 60 * 60
+STORY_CACHE_MAX_STALE = 7 * 24 * 60 * 60
+GEMINI_CALLS_PER_MINUTE = 30
+GEMINI_BURST = 5
+
+# Ledger replay for time travel (stocks/replay.py)
+
+REPLAY_CHECKPOINT_DAYS = 30
+REPLAY_MAX_USERS = 1024
+
+# Background price pre-warming (stocks/prewarm.py)
+# PREWARM_PRICES=True starts a refresh thread in each web worker that keeps
+# quotes and daily bars for held, watched and default tickers cached.
+# Intervals are in seconds and jittered by +/- PREWARM_JITTER.
+
+PREWARM_PRICES = os.getenv('PREWARM_PRICES', 'False') == 'True'
+PREWARM_INTERVAL = 45
+PREWARM_IDLE_INTERVAL = 15 * 60
+PREWARM_JITTER = 0.2
+
+# Per-request timings (stocks/perf.py)
+# Server-Timing headers on every response and rolling histograms at
+# /stocks/api/perf/stats/. The 'stocks.perf' logger writes one JSON line
+# per request at INFO; set PERF_LOG_LEVEL=INFO to get them outside DEBUG.
+
+PERF_WINDOW_SECONDS = 15 * 60
+PERF_MAX_SAMPLES = 1000
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'stocks.perf': {
+            'handlers': ['console'],
+            'level': os.getenv('PERF_LOG_LEVEL', 'INFO' if DEBUG else 'WARNING'),
+            'propagate': False,
+        },
+        'stocks.prewarm': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
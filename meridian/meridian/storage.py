@@ -0,0 +1,16 @@
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class StaticStorage(CompressedManifestStaticFilesStorage):
+    """
+    Content-hashed, pre-compressed static files (see STORAGES). Names that
+    were never collected - in tests, or an asset that is missing - fall
+    back to their plain URL instead of failing the whole page.
+    """
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
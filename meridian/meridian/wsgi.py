@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meridian.settings')
 
 application = get_wsgi_application()
+
+# keep prices for held and popular tickers warm in this worker (PREWARM_PRICES)
+from stocks import prewarm  # noqa: E402
+prewarm.start()
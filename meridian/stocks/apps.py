@@ -3,3 +3,13 @@ from django.apps import AppConfig
 
 class StocksConfig(AppConfig):
     name = "stocks"
+
+    def ready(self):
+        # time every DB query for the per-request breakdown
+        from django.db.backends.signals import connection_created
+        from . import perf
+        connection_created.connect(perf.install_db_wrapper)
+
+        # build the search index once at startup, not on the first keystroke
+        from . import symbols
+        symbols.get_index()
@@ -0,0 +1,254 @@
+"""
+Where stocks/market_data.py gets its numbers from.
+
+MARKET_DATA_BACKEND is the dotted path of the backend class and
+MARKET_DATA_BACKEND_OPTIONS its keyword arguments. Every backend answers
+the same three calls:
+
+    history(ticker, period)             -> OHLCV DataFrame, like Ticker.history()
+    info(ticker)                        -> dict, like Ticker.info
+    download(tickers, period=, start=)  -> {ticker: OHLCV DataFrame}, tz-naive
+
+YFinanceBackend talks to Yahoo. LocalBackend never touches the network:
+it replays fixtures recorded with ``manage.py record_market_data`` and
+makes up a seeded random walk for anything else, optionally sleeping to
+imitate upstream latency, so benchmarks are repeatable on an isolated box.
+"""
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from yfinance.exceptions import YFRateLimitError
+
+
+# Calendar days covered by each yfinance-style period string
+PERIOD_DAYS = {
+    '1d': 1, '2d': 4, '5d': 7, '1mo': 31, '3mo': 92, '6mo': 183,
+    '1y': 366, '2y': 731, '5y': 1827, '10y': 3653,
+}
+
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class YFinanceBackend:
+    host = 'finance.yahoo.com'
+    # counted against the breaker like an HTTP 429 (see resilience.is_transient)
+    transient_errors = (YFRateLimitError,)
+
+    def history(self, ticker, period='1mo'):
+        return yf.Ticker(ticker).history(period=period)
+
+    def intraday(self, ticker, period='1mo', interval='15m'):
+        return yf.Ticker(ticker).history(period=period, interval=interval)
+
+    def info(self, ticker):
+        return yf.Ticker(ticker).info
+
+    def download(self, tickers, period=None, start=None):
+        data = yf.download(tickers, period=period, start=start, group_by='ticker',
+                           auto_adjust=True, threads=True, progress=False)
+        if data.empty:
+            return {}
+        if data.index.tz is not None:
+            data.index = data.index.tz_localize(None)
+        if not hasattr(data.columns, 'levels'):
+            data.columns = pd.MultiIndex.from_product([tickers, data.columns])
+        bars = {}
+        for t in tickers:
+            if t not in data.columns.get_level_values(0):
+                continue
+            frame = data[t].dropna(subset=['Close'])
+            if not frame.empty:
+                bars[t] = frame
+        return bars
+
+
+class LocalBackend:
+    """
+    Offline, deterministic market data.
+
+    fixtures_dir  directory of <TICKER>.csv bars and <TICKER>.json info
+    seed          seeds the synthetic series; same seed, same prices
+    synthetic     make up data for tickers without fixtures (else: no data)
+    latency       seconds to sleep per call, plus up to ``jitter`` more
+    """
+
+    host = 'local'
+
+    # Synthetic series all start here, so a given day's bar never changes
+    # as the series grows
+    EPOCH = date(2010, 1, 4)
+    TIMEZONE = 'America/New_York'
+    SECTORS = ['Technology', 'Healthcare', 'Financial Services', 'Consumer Cyclical',
+               'Industrials', 'Energy', 'Communication Services', 'Utilities']
+
+    def __init__(self, fixtures_dir=None, seed=0, synthetic=True, latency=0.0, jitter=0.0):
+        self.fixtures_dir = Path(fixtures_dir) if fixtures_dir else None
+        self.seed = seed
+        self.synthetic = synthetic
+        self.latency = latency
+        self.jitter = jitter
+        self._bars = {}
+        self._lock = threading.Lock()
+
+    # ── Data ──────────────────────────────────────────────
+
+    def _fixture(self, ticker, suffix):
+        if self.fixtures_dir is None:
+            return None
+        path = self.fixtures_dir / f'{ticker}.{suffix}'
+        return path if path.exists() else None
+
+    def _rng(self, ticker, stream):
+        return np.random.default_rng([self.seed, zlib.crc32(ticker.encode()), stream])
+
+    def _generate(self, ticker):
+        days = pd.bdate_range(self.EPOCH, date.today())
+        n = len(days)
+        # one generator per column so a longer series keeps the same prefix
+        params = self._rng(ticker, 0)
+        start, drift, vol = params.uniform(20, 500), params.normal(3e-4, 3e-4), params.uniform(0.01, 0.03)
+        close = start * np.exp(np.cumsum(self._rng(ticker, 1).normal(drift, vol, n)))
+        gap = np.exp(self._rng(ticker, 2).normal(0, vol / 3, n))
+        open_ = np.concatenate([[start], close[:-1]]) * gap
+        wick = np.abs(self._rng(ticker, 3).normal(0, vol / 2, (2, n)))
+        return pd.DataFrame({
+            'Open': open_,
+            'High': np.maximum(open_, close) * (1 + wick[0]),
+            'Low': np.minimum(open_, close) * (1 - wick[1]),
+            'Close': close,
+            'Volume': self._rng(ticker, 4).lognormal(15, 0.6, n).astype('int64'),
+        }, index=days).round({'Open': 2, 'High': 2, 'Low': 2, 'Close': 2})
+
+    def bars(self, ticker):
+        """Every bar known for ``ticker`` (tz-naive), or an empty frame."""
+        with self._lock:
+            if ticker not in self._bars:
+                path = self._fixture(ticker, 'csv')
+                if path is not None:
+                    frame = pd.read_csv(path, index_col=0, parse_dates=True)[OHLCV]
+                elif self.synthetic:
+                    frame = self._generate(ticker)
+                else:
+                    frame = pd.DataFrame(columns=OHLCV, index=pd.DatetimeIndex([]))
+                self._bars[ticker] = frame
+            return self._bars[ticker]
+
+    def _slice(self, frame, period=None, start=None):
+        if frame.empty:
+            return frame
+        if start is not None:
+            return frame[frame.index >= pd.Timestamp(start)]
+        if period in (None, 'max'):
+            return frame
+        end = frame.index[-1]
+        if period == '1d':
+            return frame.iloc[-1:]
+        if period == 'ytd':
+            return frame[frame.index >= pd.Timestamp(end.year, 1, 1)]
+        return frame[frame.index > end - timedelta(days=PERIOD_DAYS[period])]
+
+    def _wait(self):
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    # ── Backend API ───────────────────────────────────────
+
+    def history(self, ticker, period='1mo'):
+        self._wait()
+        frame = self._slice(self.bars(ticker), period).copy()
+        if not frame.empty:
+            frame.index = frame.index.tz_localize(self.TIMEZONE)
+        return frame
+
+    def intraday(self, ticker, period='1mo', interval='15m'):
+        """
+        Minute bars over the session (9:30-16:00) of each daily bar in
+        ``period``: a random bridge from the day's open to its close that
+        stays inside its high/low.
+        """
+        self._wait()
+        daily = self._slice(self.bars(ticker), period)
+        if daily.empty:
+            return daily.copy()
+        minutes = int(interval.rstrip('m'))
+        steps, n = 390 // minutes, len(daily)
+        # seeded on the first day so a given window always gets the same bars
+        rng = np.random.default_rng([self.seed, zlib.crc32(ticker.encode()), 6, daily.index[0].toordinal()])
+        walk = np.hstack([np.zeros((n, 1)), np.cumsum(rng.normal(0, 1, (n, steps)), axis=1)])
+        t = np.linspace(0, 1, steps + 1)
+        bridge = walk - t * walk[:, -1:]
+        bridge /= np.maximum(np.abs(bridge).max(axis=1, keepdims=True), 1e-9)
+
+        o, h, l, c = (daily[col].to_numpy()[:, None] for col in ('Open', 'High', 'Low', 'Close'))
+        path = np.clip(o + (c - o) * t + bridge * (h - l) / 2, l, h)
+        opens, closes = path[:, :-1], path[:, 1:]
+        weights = rng.uniform(0.5, 1.5, (n, steps))
+        volume = daily['Volume'].to_numpy()[:, None] * weights / weights.sum(axis=1, keepdims=True)
+
+        index = (daily.index.to_numpy()[:, None] + np.timedelta64(9 * 60 + 30, 'm')
+                 + np.arange(steps) * np.timedelta64(minutes, 'm')).ravel()
+        return pd.DataFrame({
+            'Open': opens.ravel(),
+            'High': np.maximum(opens, closes).ravel(),
+            'Low': np.minimum(opens, closes).ravel(),
+            'Close': closes.ravel(),
+            'Volume': volume.ravel().astype('int64'),
+        }, index=pd.DatetimeIndex(index).tz_localize(self.TIMEZONE)).round(2)
+
+    def info(self, ticker):
+        self._wait()
+        path = self._fixture(ticker, 'json')
+        if path is not None:
+            return json.loads(path.read_text())
+        frame = self.bars(ticker)
+        if frame.empty:
+            return {}
+        return self._synthetic_info(ticker, frame)
+
+    def download(self, tickers, period=None, start=None):
+        self._wait()  # one round trip for the whole batch, like yf.download
+        bars = {}
+        for t in tickers:
+            frame = self._slice(self.bars(t), period, start)
+            if not frame.empty:
+                bars[t] = frame.copy()
+        return bars
+
+    def _synthetic_info(self, ticker, frame):
+        from .symbols import get_index
+
+        last, year = frame.iloc[-1], frame.iloc[-252:]
+        name = get_index().names.get(ticker, f'{ticker} Corp.')
+        rng = self._rng(ticker, 5)
+        shares_out = int(rng.uniform(5e7, 5e9))
+        return {
+            'symbol': ticker,
+            'shortName': name,
+            'longName': name,
+            'longBusinessSummary': f'{name} is a synthetic company generated for offline testing.',
+            'sector': self.SECTORS[zlib.crc32(ticker.encode()) % len(self.SECTORS)],
+            'exchange': 'NMS',
+            'currency': 'USD',
+            'website': '',
+            'currentPrice': float(last.Close),
+            'previousClose': float(frame['Close'].iloc[-2]) if len(frame) > 1 else float(last.Open),
+            'dayHigh': float(last.High),
+            'dayLow': float(last.Low),
+            'volume': int(last.Volume),
+            'averageVolume': int(year['Volume'].mean()),
+            'fiftyTwoWeekHigh': float(year['High'].max()),
+            'fiftyTwoWeekLow': float(year['Low'].min()),
+            'marketCap': int(last.Close * shares_out),
+            'trailingPE': round(float(rng.uniform(8, 60)), 2),
+            'dividendYield': round(float(rng.uniform(0, 3)), 2),
+            'fullTimeEmployees': int(rng.uniform(500, 200000)),
+        }
@@ -0,0 +1,113 @@
+"""
+Multi-resolution OHLCV candles.
+
+Each ticker's base bars are fetched once: 15-minute bars for the recent
+intraday window and daily bars from the local bar store. They are
+resampled into the coarser levels of the pyramid (15m -> 1h and
+1d -> 1w -> 1mo). Only the hourly level needs upstream, so it is built
+only for requests that can use it, and daily-and-up candles keep working
+while upstream is down. Range queries at any resolution then just slice
+a pre-built level by binary search, so zooming or switching periods
+never goes back to upstream.
+"""
+import pandas as pd
+from django.conf import settings
+
+from . import history_store, market_data
+from .backends import PERIOD_DAYS
+
+
+RESOLUTIONS = ['1h', '1d', '1w', '1mo']
+INTRADAY_INTERVAL = '15m'
+INTRADAY_PERIOD = getattr(settings, 'CANDLES_INTRADAY_PERIOD', '1mo')
+TTL = getattr(settings, 'CANDLES_TTL', 5 * 60)
+DEFAULT_MAX_POINTS = 500
+
+AGGREGATE = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+_pyramids = market_data.TTLCache(getattr(settings, 'CANDLES_MAX_TICKERS', 128))
+
+
+def _resample(frame, rule, **kwargs):
+    if frame.empty:
+        return frame
+    # bins with no trading (nights, weekends, holidays) come back all-NaN
+    return frame.resample(rule, **kwargs).agg(AGGREGATE).dropna(subset=['Close'])
+
+
+def build_daily(daily):
+    """The daily, weekly and monthly levels, keyed by resolution."""
+    return {
+        '1d': daily,
+        '1w': _resample(daily, 'W-MON', label='left', closed='left'),
+        '1mo': _resample(daily, 'MS'),
+    }
+
+
+def build(intraday, daily):
+    """Every level of the pyramid from the two base frames, keyed by resolution."""
+    # sessions open at 9:30, so hourly bins start on the half hour
+    return {'1h': _resample(intraday, '60min', offset='30min'), **build_daily(daily)}
+
+
+def get_pyramid(ticker, hourly=True):
+    """
+    Levels for ``ticker``. The daily ones come from the local bar store;
+    only the hourly level needs upstream, so ``hourly=False`` leaves it out.
+    """
+    ticker = ticker.upper()
+    levels = dict(_pyramids.get_or_fetch(
+        ('candles', ticker), TTL, lambda: build_daily(history_store.get_frame(ticker))))
+    if hourly:
+        levels['1h'] = _pyramids.get_or_fetch(('candles', ticker, '1h'), TTL, lambda: _resample(
+            market_data.get_intraday(ticker, period=INTRADAY_PERIOD, interval=INTRADAY_INTERVAL),
+            '60min', offset='30min'))
+    return levels
+
+
+def _intraday_covers(start):
+    oldest = pd.Timestamp.today().normalize() - pd.Timedelta(days=PERIOD_DAYS[INTRADAY_PERIOD])
+    return start is not None and pd.Timestamp(start) >= oldest
+
+
+def _window(level, start, end):
+    # ``end`` is an inclusive date, so take everything before the next midnight
+    lo = level.index.searchsorted(pd.Timestamp(start)) if start else 0
+    hi = (level.index.searchsorted(pd.Timestamp(end) + pd.Timedelta(days=1))
+          if end else len(level))
+    return level.iloc[lo:hi]
+
+
+def get_candles(ticker, resolution=None, start=None, end=None, max_points=DEFAULT_MAX_POINTS):
+    """
+    (resolution, OHLCV frame) for ``ticker`` between the ``start`` and
+    ``end`` dates, both inclusive and optional. Without a ``resolution``
+    the finest level that fits in ``max_points`` candles is used.
+    """
+    if resolution is not None:
+        levels = get_pyramid(ticker, hourly=resolution == '1h')
+        return resolution, _window(levels[resolution], start, end)
+    try:
+        # hourly candles only reach back over the intraday window
+        levels = get_pyramid(ticker, hourly=_intraday_covers(start))
+    except Exception:
+        # upstream is down: the daily levels are all local
+        levels = get_pyramid(ticker, hourly=False)
+    for resolution in RESOLUTIONS:
+        level = levels.get(resolution)
+        if resolution == '1h' and (level is None or start is None or level.empty or
+                                   level.index[0].normalize() > pd.Timestamp(start)):
+            continue
+        window = _window(level, start, end)
+        if len(window) <= max_points:
+            return resolution, window
+    return resolution, window.iloc[-max_points:]
+
+
+def stats():
+    return _pyramids.stats()
+
+
+def clear():
+    _pyramids.clear()
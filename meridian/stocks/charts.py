@@ -0,0 +1,56 @@
+"""
+Chart series for api_stock.
+
+Closes come back as parallel numpy arrays (ISO dates, prices rounded to
+cents) so they can be sliced, downsampled and serialised without a
+per-row Python loop. ``lttb`` thins a long series to a point budget
+while keeping its visual shape: peaks, troughs and the endpoints survive.
+"""
+import numpy as np
+
+from . import history_store, market_data
+
+
+def close_history(ticker, period):
+    """(dates, closes) for the chart: ISO date strings and closes in cents precision."""
+    if history_store.covers(period):
+        dates, closes = history_store.get_series(ticker).window(period)
+        dates = np.datetime_as_string(np.array(dates, dtype='datetime64[D]'), unit='D')
+    else:
+        history = market_data.get_history(ticker, period=period)
+        dates, closes = history.index.strftime('%Y-%m-%d').to_numpy(), history['Close'].to_numpy()
+    return dates, np.round(np.asarray(closes, dtype=float), 2)
+
+
+def lttb(values, threshold):
+    """
+    Indices of ``threshold`` points chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. Every other point is the one
+    in its bucket forming the largest triangle with the previous pick and
+    the average of the next bucket. Returns every index when the series is
+    already within budget.
+    """
+    y = np.asarray(values, dtype=float)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=float)
+    # points 1..n-2 split into threshold - 2 buckets; bucket i is edges[i]:edges[i + 1]
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    counts = np.diff(edges)
+    # each bucket's centroid, with the last point standing in for the bucket after the last
+    avg_x = np.append(np.add.reduceat(x[:n - 1], edges[:-1]) / counts, x[-1])
+    avg_y = np.append(np.add.reduceat(y[:n - 1], edges[:-1]) / counts, y[-1])
+
+    picked = np.empty(threshold, dtype=int)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - avg_x[i + 1]) * (y[lo:hi] - y[a])
+                      - (x[a] - x[lo:hi]) * (avg_y[i + 1] - y[a]))
+        a = lo + int(area.argmax())
+        picked[i + 1] = a
+    return picked
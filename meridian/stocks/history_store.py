@@ -0,0 +1,180 @@
+"""
+Local daily-bar store backed by the PriceBar table.
+
+The first lookup for a ticker backfills HISTORY_STORE_BACKFILL of daily
+bars; after that only the missing tail is downloaded and appended. Loaded
+series are kept in memory and answer "close on or before D" with a binary
+search over the sorted dates.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+
+import pandas as pd
+from django.conf import settings
+from django.db.models import Max, OuterRef, Subquery
+
+from . import market_data
+from .backends import OHLCV, PERIOD_DAYS
+from .models import PriceBar
+
+
+BACKFILL_PERIOD = getattr(settings, 'HISTORY_STORE_BACKFILL', '2y')
+# How long a synced series is trusted before we ask upstream for new bars
+SYNC_TTL = getattr(settings, 'HISTORY_STORE_SYNC_TTL', 15 * 60)
+STALE_RETRY = getattr(settings, 'HISTORY_STORE_STALE_RETRY', 30)
+
+
+_series_cache = market_data.TTLCache(getattr(settings, 'HISTORY_STORE_MAX_SERIES', 256))
+
+
+class BarSeries:
+    """
+    Sorted daily closes for one ticker. ``stale`` is set when the last
+    sync failed and the series is only what was already stored.
+    """
+
+    def __init__(self, ticker, dates, closes, stale=False):
+        self.ticker = ticker
+        self.dates = dates
+        self.closes = closes
+        self.stale = stale
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def last_close(self):
+        return self.closes[-1] if self.closes else None
+
+    def close_on_or_before(self, day):
+        i = bisect_right(self.dates, day) - 1
+        return self.closes[i] if i >= 0 else None
+
+    def since(self, start):
+        """(dates, closes) from ``start`` onwards."""
+        i = bisect_left(self.dates, start)
+        return self.dates[i:], self.closes[i:]
+
+    def window(self, period):
+        """(dates, closes) for a yfinance-style period ending at the last bar."""
+        if not self.dates or period == 'max':
+            return self.dates, self.closes
+        end = self.dates[-1]
+        if period == 'ytd':
+            return self.since(date(end.year, 1, 1))
+        if period == '1d':
+            return self.dates[-1:], self.closes[-1:]
+        return self.since(end - timedelta(days=PERIOD_DAYS[period]))
+
+
+def covers(period):
+    """Whether the store keeps enough history to answer ``period``."""
+    if period == 'ytd':
+        return True
+    if period not in PERIOD_DAYS:
+        return False
+    return PERIOD_DAYS[period] <= PERIOD_DAYS.get(BACKFILL_PERIOD, 0)
+
+
+def _load(ticker, stale=False):
+    rows = (PriceBar.objects.filter(ticker=ticker)
+            .order_by('date').values_list('date', 'close'))
+    dates, closes = [], []
+    for d, c in rows:
+        dates.append(d)
+        closes.append(c)
+    return BarSeries(ticker, dates, closes, stale)
+
+
+def _save(ticker, frame):
+    bars = [
+        PriceBar(ticker=ticker, date=ts.date(), open=r.Open, high=r.High,
+                 low=r.Low, close=r.Close, volume=int(r.Volume or 0))
+        for ts, r in zip(frame.index, frame.itertuples(index=False))
+    ]
+    # the last stored bar may have been a partial day, so overwrite on conflict
+    PriceBar.objects.bulk_create(
+        bars, update_conflicts=True, unique_fields=['ticker', 'date'],
+        update_fields=['open', 'high', 'low', 'close', 'volume'],
+    )
+
+
+def sync(tickers):
+    """
+    Append any missing bars for ``tickers``: one batched backfill for new
+    tickers, and one tail download per distinct last-bar date (normally
+    just one) for the rest.
+    """
+    last = dict(PriceBar.objects.filter(ticker__in=tickers)
+                .values('ticker').annotate(last=Max('date'))
+                .values_list('ticker', 'last'))
+    new = [t for t in tickers if t not in last]
+    by_start = {}
+    for t in tickers:
+        if t in last:
+            by_start.setdefault(last[t], []).append(t)
+
+    if new:
+        for t, frame in market_data.download_bars(new, period=BACKFILL_PERIOD).items():
+            _save(t, frame)
+    # grouped so one long-stale or delisted ticker doesn't drag the whole
+    # batch back to its date; the last bar is re-fetched as it may be partial
+    for start, group in by_start.items():
+        for t, frame in market_data.download_bars(group, start=start.isoformat()).items():
+            _save(t, frame[frame.index.date >= start])
+
+
+def get_many(tickers):
+    """Synced BarSeries for each ticker, keyed by ticker."""
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+
+    def fetch_many(keys):
+        names = [k[1] for k in keys]
+        try:
+            sync(names)
+            stale = False
+        except Exception:
+            stale = True  # serve whatever is already stored
+        return {('bars', t): _load(t, stale) for t in names}
+
+    def ttl(series):
+        # after a failed sync, try upstream again soon instead of in SYNC_TTL
+        return STALE_RETRY if series.stale else SYNC_TTL
+
+    found = _series_cache.get_many_or_fetch([('bars', t) for t in tickers], ttl, fetch_many)
+    return {k[1]: series for k, series in found.items()}
+
+
+def prime(tickers, ttl):
+    """Sync ``tickers`` now and keep their series cached for ``ttl`` seconds."""
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    sync(tickers)
+    for t in tickers:
+        _series_cache.put(('bars', t), ttl, _load(t))
+
+
+def get_series(ticker):
+    return get_many([ticker])[ticker.upper()]
+
+
+def last_closes(tickers):
+    """The latest stored close for each ticker, without asking upstream."""
+    latest = (PriceBar.objects.filter(ticker=OuterRef('ticker'))
+              .order_by('-date').values('date')[:1])
+    rows = PriceBar.objects.filter(ticker__in=tickers, date=Subquery(latest))
+    return dict(rows.values_list('ticker', 'close'))
+
+
+def get_frame(ticker):
+    """Synced daily OHLCV bars for ``ticker`` as a DataFrame on a date index."""
+    ticker = ticker.upper()
+    get_many([ticker])
+    rows = (PriceBar.objects.filter(ticker=ticker).order_by('date')
+            .values_list('date', 'open', 'high', 'low', 'close', 'volume'))
+    frame = pd.DataFrame.from_records(list(rows), columns=['Date', *OHLCV], index='Date')
+    frame.index = pd.DatetimeIndex(frame.index)
+    return frame
+
+
+def stats():
+    return _series_cache.stats()
@@ -0,0 +1,277 @@
+import json
+import logging
+import random
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import (CaptureQueriesContext, setup_databases,
+                               setup_test_environment, teardown_databases,
+                               teardown_test_environment)
+from django.utils import timezone
+
+from leaderboard import services as leaderboard
+from login.models import Profile
+from stocks import market_data
+from stocks.models import Holding, Position, Transaction
+from stocks.symbols import get_index
+
+
+SEARCH_QUERIES = ['app', 'micro', 'tesla', 'nvda', 'amaz', 'goog', 'netfl', 'AMD', 'disny', 'coca']
+TIMETRAVEL_DAYS = [7, 30, 90, 180, 365]
+
+
+class Command(BaseCommand):
+    help = ('Seed users, holdings and trades on the offline market-data backend, '
+            'drive the stocks API with concurrent clients and report latency percentiles.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--holdings', type=int, default=5, help='Tickers held per user')
+        parser.add_argument('--transactions', type=int, default=50, help='Ledger rows per user')
+        parser.add_argument('--clients', type=int, default=8, help='Concurrent clients')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--latency', type=float, default=0.0,
+                            help='Artificial market-data latency per upstream call, in seconds')
+        parser.add_argument('--only', help='Comma-separated endpoint names to run')
+        parser.add_argument('--out', help='Write the results as JSON to this file')
+        parser.add_argument('--baseline', help='Earlier --out file to compare against')
+        parser.add_argument('--plain-sqlite', action='store_true',
+                            help="Drop the WAL/busy-timeout/IMMEDIATE tuning to compare against SQLite's defaults")
+
+    def handle(self, *args, **options):
+        # a throwaway file database, so nothing touches db.sqlite3 and
+        # concurrent clients don't contend on SQLite's shared-cache locks
+        backend = {
+            'MARKET_DATA_BACKEND': 'stocks.backends.LocalBackend',
+            'MARKET_DATA_BACKEND_OPTIONS': {'seed': options['seed'], 'latency': options['latency']},
+        }
+        # one log line per request would swamp the report
+        logging.getLogger('stocks.perf').setLevel(logging.WARNING)
+        with tempfile.TemporaryDirectory(prefix='meridian-bench-') as tmp:
+            if connection.vendor == 'sqlite':
+                connection.settings_dict.setdefault('TEST', {})['NAME'] = str(Path(tmp) / 'bench.sqlite3')
+                if options['plain_sqlite']:
+                    connection.settings_dict['OPTIONS'] = {}
+                connection.close()
+            setup_test_environment()
+            old_config = setup_databases(verbosity=0, interactive=False)
+            try:
+                with override_settings(**backend):
+                    market_data.backend.cache_clear()
+                    market_data.clear()
+                    report = self.run(options)
+            finally:
+                market_data.backend.cache_clear()
+                teardown_databases(old_config, verbosity=0)
+                teardown_test_environment()
+
+        self.print_report(report, options['baseline'])
+        if options['out']:
+            Path(options['out']).write_text(json.dumps(report, indent=2))
+            self.stdout.write(f'Wrote {options["out"]}')
+
+    # ── Seeding ───────────────────────────────────────────
+
+    def seed(self, options, rng):
+        backend = market_data.backend()
+        universe = sorted(get_index().names)
+        now = timezone.now()
+        users = []
+        for i in range(options['users']):
+            user = User.objects.create_user(f'bench{i}')
+            Profile.objects.create(user=user, balance=1_000_000.0)
+            users.append((user, rng.sample(universe, options['holdings'])))
+
+        txns, lots, positions = [], [], []
+        for user, tickers in users:
+            held = {t: Position(user=user, ticker=t) for t in tickers}
+            count = max(options['transactions'], len(tickers))
+            days = sorted(rng.randint(1, 365) for _ in range(count))[::-1]
+            for n, days_ago in enumerate(days):
+                ticker = tickers[n] if n < len(tickers) else rng.choice(tickers)
+                pos = held[ticker]
+                bars = backend.bars(ticker)
+                when = now - timedelta(days=days_ago)
+                price = float(bars['Close'].asof(when.replace(tzinfo=None)))
+                if n < len(tickers) or pos.shares <= 1 or rng.random() < 0.6:
+                    action, shares = Transaction.BUY, float(rng.randint(20, 100))
+                    pos.add(shares, price)
+                else:
+                    action, shares = Transaction.SELL, float(rng.randint(1, int(pos.shares)))
+                    pos.remove(shares)
+                txns.append((when, Transaction(user=user, ticker=ticker, action=action,
+                                               shares=shares, price=price, total=shares * price)))
+                lots.append((when, Holding(user=user, ticker=ticker, buy_price=price,
+                                           shares=shares if action == Transaction.BUY else -shares)))
+            positions.extend(held.values())
+
+        # created_at / bought_at are auto_now_add, so backdate them afterwards
+        Transaction.objects.bulk_create([t for _, t in txns], batch_size=500)
+        Holding.objects.bulk_create([h for _, h in lots], batch_size=500)
+        for when, t in txns:
+            t.created_at = when
+        for when, h in lots:
+            h.bought_at = when
+        Transaction.objects.bulk_update([t for _, t in txns], ['created_at'], batch_size=500)
+        Holding.objects.bulk_update([h for _, h in lots], ['bought_at'], batch_size=500)
+        Position.objects.bulk_create(positions, batch_size=500)
+        leaderboard.refresh_all()
+        return users
+
+    # ── Load ──────────────────────────────────────────────
+
+    def scenarios(self, rng):
+        def price(ticker):
+            return float(market_data.backend().bars(ticker)['Close'].iloc[-1])
+
+        def trade(user, tickers):
+            ticker = rng.choice(tickers)
+            return {'ticker': ticker, 'shares': 1, 'price': price(ticker)}
+
+        return {
+            'api_portfolio': lambda user, tickers: ('get', '/stocks/api/portfolio/', None),
+            'api_buy': lambda user, tickers: ('post', '/stocks/api/buy/', trade(user, tickers)),
+            'api_sell': lambda user, tickers: ('post', '/stocks/api/sell/', trade(user, tickers)),
+            'transactions_view': lambda user, tickers: ('get', '/stocks/history/', None),
+            'leaderboard_view': lambda user, tickers: ('get', '/leaderboard/', None),
+            'api_timetravel': lambda user, tickers: (
+                'get', f'/stocks/api/timetravel/?days={rng.choice(TIMETRAVEL_DAYS)}', None),
+            'api_search': lambda user, tickers: (
+                'get', f'/stocks/api/search/{rng.choice(SEARCH_QUERIES)}/', None),
+        }
+
+    def drive(self, make_request, users, options):
+        clients = min(options['clients'], len(users))
+        per_client = [options['requests'] // clients + (i < options['requests'] % clients)
+                      for i in range(clients)]
+        samples, queries, errors = [], [], []
+        lock = threading.Lock()
+        start_line = threading.Barrier(clients + 1)
+
+        def worker(i):
+            user, tickers = users[i]
+            client = Client(raise_request_exception=False)
+            client.force_login(user)
+            own_samples, own_queries, own_errors = [], [], 0
+            start_line.wait()
+            try:
+                for _ in range(per_client[i]):
+                    method, path, data = make_request(user, tickers)
+                    kwargs = {'data': json.dumps(data), 'content_type': 'application/json'} if data else {}
+                    with CaptureQueriesContext(connection) as ctx:
+                        t0 = time.perf_counter()
+                        response = getattr(client, method)(path, **kwargs)
+                        own_samples.append(time.perf_counter() - t0)
+                    own_queries.append(len(ctx.captured_queries))
+                    own_errors += response.status_code >= 400
+            finally:
+                connection.close()
+            with lock:
+                samples.extend(own_samples)
+                queries.extend(own_queries)
+                errors.append(own_errors)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(clients)]
+        for t in threads:
+            t.start()
+        start_line.wait()
+        wall = time.perf_counter()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - wall
+
+        ms = np.array(samples) * 1000
+        return {
+            'requests': len(samples),
+            'errors': sum(errors),
+            'clients': clients,
+            'p50_ms': round(float(np.percentile(ms, 50)), 2),
+            'p95_ms': round(float(np.percentile(ms, 95)), 2),
+            'p99_ms': round(float(np.percentile(ms, 99)), 2),
+            'mean_ms': round(float(ms.mean()), 2),
+            'max_ms': round(float(ms.max()), 2),
+            'throughput_rps': round(len(samples) / wall, 1),
+            'queries_per_request': round(float(np.mean(queries)), 1),
+            'max_queries': int(max(queries)),
+        }
+
+    def run(self, options):
+        rng = random.Random(options['seed'])
+        t0 = time.perf_counter()
+        users = self.seed(options, rng)
+        seeded = time.perf_counter() - t0
+        self.stdout.write(f'Seeded {len(users)} users in {seeded:.1f}s')
+        database = _describe_database()
+        self.stdout.write(f'Database: {database}')
+
+        scenarios = self.scenarios(rng)
+        if options['only']:
+            names = [n.strip() for n in options['only'].split(',')]
+            scenarios = {n: scenarios[n] for n in names}
+
+        results = {}
+        for name, make_request in scenarios.items():
+            # one untimed pass per client so caches and sessions are warm
+            self.drive(make_request, users, {**options, 'requests': options['clients']})
+            results[name] = self.drive(make_request, users, options)
+            self.stdout.write(f'  {name}: done')
+
+        return {
+            'meta': {
+                'commit': _git_commit(),
+                'created': timezone.now().isoformat(),
+                'options': {k: options[k] for k in ('users', 'holdings', 'transactions', 'clients',
+                                                     'requests', 'seed', 'latency')},
+                'database': database,
+                'seed_seconds': round(seeded, 2),
+            },
+            'endpoints': results,
+        }
+
+    # ── Output ────────────────────────────────────────────
+
+    def print_report(self, report, baseline_path):
+        baseline = {}
+        if baseline_path:
+            baseline = json.loads(Path(baseline_path).read_text()).get('endpoints', {})
+
+        self.stdout.write(f'\n{"endpoint":<20}{"p50":>9}{"p95":>9}{"p99":>9}{"req/s":>9}{"queries":>9}{"errors":>8}')
+        for name, r in report['endpoints'].items():
+            line = (f'{name:<20}{r["p50_ms"]:>9.1f}{r["p95_ms"]:>9.1f}{r["p99_ms"]:>9.1f}'
+                    f'{r["throughput_rps"]:>9.1f}{r["queries_per_request"]:>9.1f}{r["errors"]:>8}')
+            old = baseline.get(name)
+            if old and old['p95_ms']:
+                change = (r['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100
+                style = self.style.ERROR if change > 10 else self.style.SUCCESS
+                line += style(f'   p95 {change:+.0f}% vs baseline')
+            self.stdout.write(line)
+
+
+def _describe_database():
+    db = {'vendor': connection.vendor, 'conn_max_age': connection.settings_dict['CONN_MAX_AGE']}
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            for pragma in ('journal_mode', 'synchronous', 'busy_timeout'):
+                cursor.execute(f'PRAGMA {pragma}')
+                db[pragma] = cursor.fetchone()[0]
+        db['transaction_mode'] = connection.settings_dict['OPTIONS'].get('transaction_mode', 'DEFERRED')
+    return db
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=settings.BASE_DIR, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
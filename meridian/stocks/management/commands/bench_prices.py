@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from stocks import market_data
+from stocks.symbols import COMPANY_NAME_MAP
+
+
+class Command(BaseCommand):
+    help = 'Compare per-ticker history() calls against one batched price fetch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=50, help='Number of tickers in the portfolio')
+        parser.add_argument('--period', default='1y')
+        parser.add_argument('--tickers', help='Comma-separated tickers (defaults to the search map)')
+
+    def handle(self, *args, **options):
+        if options['tickers']:
+            tickers = [t.strip().upper() for t in options['tickers'].split(',') if t.strip()]
+        else:
+            tickers = sorted(set(COMPANY_NAME_MAP.values()))
+        tickers = tickers[:options['count']]
+        period = options['period']
+        self.stdout.write(f'{len(tickers)} tickers, period={period}')
+
+        # Old path: one history() round trip per holding, on the request thread
+        start = time.perf_counter()
+        for t in tickers:
+            try:
+                market_data.backend().history(t, period)
+            except Exception:
+                pass
+        sequential = time.perf_counter() - start
+        self.stdout.write(f'  sequential history(): {sequential:8.2f}s')
+
+        # New path: cold batched fetch, then a warm read from the cache
+        market_data.clear()
+        start = time.perf_counter()
+        closes = market_data.get_closes(tickers, period=period)
+        batched = time.perf_counter() - start
+        self.stdout.write(f'  batched get_closes(): {batched:8.2f}s  ({closes.shape[1]} tickers x {closes.shape[0]} days)')
+
+        start = time.perf_counter()
+        market_data.get_closes(tickers, period=period)
+        warm = time.perf_counter() - start
+        self.stdout.write(f'  warm get_closes():    {warm * 1000:8.2f}ms')
+
+        if batched:
+            self.stdout.write(self.style.SUCCESS(f'speedup: {sequential / batched:.1f}x cold'))
@@ -0,0 +1,30 @@
+import threading
+
+from django.core.management.base import BaseCommand
+
+from stocks import prewarm
+
+
+class Command(BaseCommand):
+    help = ('Refresh quotes and daily bars for every held, watched and default ticker, '
+            'then keep doing so on a jittered, market-hours-aware schedule.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run a single pass and exit')
+
+    def handle(self, *args, **options):
+        # The caches filled here belong to this process; web workers warm
+        # their own with PREWARM_PRICES=True. Run standalone, this keeps the
+        # shared PriceBar table current.
+        if options['once']:
+            names = prewarm.run_once(ttl=prewarm.next_delay())
+            self.stdout.write(self.style.SUCCESS(f'Warmed {len(names)} tickers'))
+            return
+
+        def report(names, delay):
+            self.stdout.write(f'Warmed {len(names)} tickers; next pass in {delay:.0f}s')
+
+        try:
+            prewarm.run_forever(threading.Event(), on_pass=report)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,34 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from stocks.models import Holding, Position
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized Position table by replaying Holding lots.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only rebuild positions for this username')
+
+    def handle(self, *args, **options):
+        lots = Holding.objects.order_by('bought_at', 'id')
+        positions = Position.objects.all()
+        if options['user']:
+            user = User.objects.get(username=options['user'])
+            lots = lots.filter(user=user)
+            positions = positions.filter(user=user)
+
+        rebuilt = {}
+        for lot in lots.iterator():
+            key = (lot.user_id, lot.ticker)
+            pos = rebuilt.setdefault(key, Position(user_id=lot.user_id, ticker=lot.ticker))
+            if lot.shares >= 0:
+                pos.add(lot.shares, float(lot.buy_price))
+            else:
+                pos.remove(-lot.shares)
+
+        with transaction.atomic():
+            positions.delete()
+            Position.objects.bulk_create(rebuilt.values())
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(rebuilt)} positions'))
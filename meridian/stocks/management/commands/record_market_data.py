@@ -0,0 +1,42 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from stocks import market_data
+from stocks.symbols import COMPANY_NAME_MAP
+
+
+class Command(BaseCommand):
+    help = 'Record daily bars and .info for tickers as fixtures for the offline LocalBackend.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('out', help='Directory to write <TICKER>.csv / <TICKER>.json into')
+        parser.add_argument('--tickers', help='Comma-separated tickers (defaults to the search map)')
+        parser.add_argument('--period', default='2y')
+
+    def handle(self, *args, **options):
+        if options['tickers']:
+            tickers = [t.strip().upper() for t in options['tickers'].split(',') if t.strip()]
+        else:
+            tickers = sorted(set(COMPANY_NAME_MAP.values()))
+        out = Path(options['out'])
+        out.mkdir(parents=True, exist_ok=True)
+
+        backend = market_data.backend()
+        bars = backend.download(tickers, period=options['period'])
+        if not bars:
+            raise CommandError('The market-data backend returned no bars.')
+        for ticker, frame in bars.items():
+            frame.to_csv(out / f'{ticker}.csv', index_label='Date')
+            try:
+                info = backend.info(ticker)
+            except Exception as e:
+                self.stderr.write(f'  {ticker}: no info ({e})')
+                continue
+            (out / f'{ticker}.json').write_text(json.dumps(info, indent=1, default=str))
+
+        missing = sorted(set(tickers) - set(bars))
+        self.stdout.write(self.style.SUCCESS(f'Recorded {len(bars)} tickers into {out}'))
+        if missing:
+            self.stdout.write(f'No data for: {", ".join(missing)}')
@@ -0,0 +1,356 @@
+"""
+Shared market-data service for the stocks views.
+
+Every market-data lookup goes through here so that many viewers of the
+same ticker share one upstream round trip. The upstream itself is the
+backend named by MARKET_DATA_BACKEND (see stocks/backends.py). Results are kept in a bounded LRU
+cache with per-period TTLs, and concurrent misses for the same key are
+coalesced into a single fetch (single-flight).
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+import pandas as pd
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from . import perf, resilience
+
+
+# Seconds a cached result stays fresh. Short periods move intraday, long
+# ones barely change between requests. Override with MARKET_DATA_TTLS.
+DEFAULT_TTLS = {
+    'info': 60 * 60,
+    'history:1d': 60,
+    'history:2d': 60,
+    'history:5d': 2 * 60,
+    'history': 10 * 60,
+    'intraday': 5 * 60,
+}
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_BACKEND = 'stocks.backends.YFinanceBackend'
+
+
+def _ttl(kind, period=None):
+    ttls = {**DEFAULT_TTLS, **getattr(settings, 'MARKET_DATA_TTLS', {})}
+    if period and f'{kind}:{period}' in ttls:
+        return ttls[f'{kind}:{period}']
+    return ttls[kind]
+
+
+class _Flight:
+    """One in-progress upstream fetch that other callers can wait on."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry expiry and single-flight misses."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.evictions = 0
+        self.fetches = 0
+        self.fetch_time = 0.0
+        self.fetch_time_max = 0.0
+
+    def get_or_fetch(self, key, ttl, fetch):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        start = time.perf_counter()
+        try:
+            flight.value = fetch()
+        except BaseException as e:
+            # KeyboardInterrupt and friends too, so None is never cached
+            flight.error = e
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._inflight.pop(key, None)
+                self.fetches += 1
+                self.fetch_time += elapsed
+                self.fetch_time_max = max(self.fetch_time_max, elapsed)
+                if flight.error is not None:
+                    self.errors += 1
+                else:
+                    self._store(key, ttl, flight.value)
+            flight.event.set()
+        return flight.value
+
+    def get_many_or_fetch(self, keys, ttl, fetch_many):
+        """
+        Batched variant of get_or_fetch. ``fetch_many(missing_keys)`` is
+        called once with every key that is neither cached nor already being
+        fetched by someone else, and must return a dict of key -> value.
+        """
+        now = time.monotonic()
+        results, owned, waiting = {}, {}, {}
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is not None and entry[0] > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    results[key] = entry[1]
+                elif key in self._inflight:
+                    self.coalesced += 1
+                    waiting[key] = self._inflight[key]
+                else:
+                    self.misses += 1
+                    owned[key] = self._inflight[key] = _Flight()
+
+        if owned:
+            start = time.perf_counter()
+            error = None
+            try:
+                fetched = fetch_many(list(owned))
+            except BaseException as e:
+                fetched, error = {}, e
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.fetches += 1
+                self.fetch_time += elapsed
+                self.fetch_time_max = max(self.fetch_time_max, elapsed)
+                for key, flight in owned.items():
+                    self._inflight.pop(key, None)
+                    if key in fetched:
+                        flight.value = results[key] = fetched[key]
+                        self._store(key, ttl, flight.value)
+                    else:
+                        flight.error = error or KeyError(key)
+                        self.errors += 1
+            for flight in owned.values():
+                flight.event.set()
+            if error is not None:
+                raise error
+
+        for key, flight in waiting.items():
+            flight.event.wait()
+            if flight.error is None:
+                results[key] = flight.value
+        return results
+
+    def get_many_or_stale(self, keys, ttl, fetch_many):
+        """
+        get_many_or_fetch that degrades instead of failing. Keys the fetch
+        could not supply are served from their last cached value, however
+        old. Returns (results, keys served stale).
+        """
+        try:
+            results = self.get_many_or_fetch(keys, ttl, fetch_many)
+        except Exception:
+            results = {}
+        now, stale = time.monotonic(), set()
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if key not in results and entry is not None:
+                    results[key] = entry[1]
+                    if entry[0] <= now:
+                        stale.add(key)
+        return results, stale
+
+    def put(self, key, ttl, value):
+        """Store ``value`` directly, e.g. from a background refresh."""
+        with self._lock:
+            self._store(key, ttl, value)
+
+    def _store(self, key, ttl, value):
+        # caller holds self._lock; ``ttl`` may be a function of the value
+        if callable(ttl):
+            ttl = ttl(value)
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'entries': len(self._data),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'errors': self.errors,
+                'evictions': self.evictions,
+                'upstream_fetches': self.fetches,
+                'hit_rate': round((self.hits + self.coalesced) / lookups, 4) if lookups else 0,
+                'avg_fetch_ms': round(self.fetch_time / self.fetches * 1000, 2) if self.fetches else 0,
+                'max_fetch_ms': round(self.fetch_time_max * 1000, 2),
+            }
+
+
+_cache = TTLCache(getattr(settings, 'MARKET_DATA_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+
+
+@lru_cache(maxsize=1)
+def backend():
+    """The configured market-data backend instance."""
+    cls = import_string(getattr(settings, 'MARKET_DATA_BACKEND', DEFAULT_BACKEND))
+    return cls(**getattr(settings, 'MARKET_DATA_BACKEND_OPTIONS', {}))
+
+
+def _fetch(fn, *args, bulk=False, **kwargs):
+    """
+    One backend call, timed for the current request and guarded by the
+    backend host's circuit breaker (stocks/resilience.py). Single-ticker
+    reads are hedged; bulk downloads get a longer deadline instead.
+    """
+    host = getattr(backend(), 'host', type(backend()).__name__)
+    options = {'transient': getattr(backend(), 'transient_errors', ())}
+    if bulk:
+        options['deadline'] = resilience.BULK_DEADLINE
+    else:
+        options['hedge_after'] = resilience.HEDGE_AFTER
+    with perf.timed('market_data'):
+        return resilience.call(host, fn, *args, **options, **kwargs)
+
+
+# ── Public API ────────────────────────────────────────────
+
+def get_history(ticker, period='1mo'):
+    """Daily bars for ``ticker`` over ``period``, shaped like yfinance's history()."""
+    ticker = ticker.upper()
+    history = _cache.get_or_fetch(
+        ('history', ticker, period), _ttl('history', period),
+        lambda: _fetch(backend().history, ticker, period),
+    )
+    # shallow copy so callers can reassign the index without touching the cache
+    return history.copy(deep=False)
+
+
+def get_intraday(ticker, period='1mo', interval='15m'):
+    """Intraday bars for ``ticker`` with a tz-naive, exchange-local index."""
+    ticker = ticker.upper()
+
+    def fetch():
+        bars = _fetch(backend().intraday, ticker, period=period, interval=interval)
+        if bars.index.tz is not None:
+            bars.index = bars.index.tz_localize(None)
+        return bars
+
+    bars = _cache.get_or_fetch(('intraday', ticker, period, interval), _ttl('intraday'), fetch)
+    return bars.copy(deep=False)
+
+
+def get_info(ticker):
+    """The yfinance-style ``.info`` dict for ``ticker``."""
+    ticker = ticker.upper()
+    info = _cache.get_or_fetch(
+        ('info', ticker), _ttl('info'),
+        lambda: _fetch(backend().info, ticker),
+    )
+    return dict(info)
+
+
+def download_bars(tickers, period=None, start=None):
+    """
+    Uncached daily OHLCV bars for many tickers in one backend round trip.
+
+    Returns a dict of ticker -> DataFrame with a tz-naive date index.
+    Tickers the backend has no data for are left out.
+    """
+    return _fetch(backend().download, [t.upper() for t in tickers], period=period, start=start,
+                  bulk=True)
+
+
+def _fetch_closes(period):
+    def fetch_many(keys):
+        bars = download_bars([k[1] for k in keys], period=period)
+        return {('close', t, period): frame['Close'] for t, frame in bars.items()}
+    return fetch_many
+
+
+def get_closes(tickers, period='1mo'):
+    """
+    Close prices for many tickers as one DataFrame (dates x tickers).
+
+    Tickers that are not cached yet are fetched together in a single
+    download instead of one ``history()`` round trip each. Tickers the
+    backend has no data for are left out of the frame.
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    if not tickers:
+        return pd.DataFrame()
+    found = _cache.get_many_or_fetch(
+        [('close', t, period) for t in tickers], _ttl('history', period), _fetch_closes(period),
+    )
+    return pd.DataFrame({k[1]: s for k, s in found.items()}).sort_index()
+
+
+def get_closes_or_stale(tickers, period='1mo'):
+    """
+    Like get_closes, but never raises for upstream trouble. Tickers that
+    can't be fetched now keep their last cached closes. Returns (frame,
+    set of tickers whose closes are stale).
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    if not tickers:
+        return pd.DataFrame(), set()
+    found, stale = _cache.get_many_or_stale(
+        [('close', t, period) for t in tickers], _ttl('history', period), _fetch_closes(period),
+    )
+    frame = pd.DataFrame({k[1]: s for k, s in found.items()}).sort_index()
+    return frame, {k[1] for k in stale}
+
+
+def prime_closes(tickers, period, ttl):
+    """
+    Download closes for ``tickers`` in one round trip and cache them for
+    ``ttl`` seconds under the keys get_closes reads, whether or not they
+    are cached already. Returns how many tickers had data.
+    """
+    bars = download_bars(list(dict.fromkeys(t.upper() for t in tickers)), period=period)
+    for t, frame in bars.items():
+        _cache.put(('close', t, period), ttl, frame['Close'])
+    return len(bars)
+
+
+def stats():
+    return _cache.stats()
+
+
+def clear():
+    _cache.clear()
@@ -0,0 +1,118 @@
+import json
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import connection
+from django.middleware import gzip
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import perf
+
+
+logger = logging.getLogger('stocks.perf')
+
+
+class PerformanceMiddleware:
+    """
+    Times each request and breaks it down into DB queries and upstream
+    calls (see stocks/perf.py). The breakdown goes out as a Server-Timing
+    header and one JSON log line, and is added to the rolling per-URL
+    histograms behind api_perf_stats.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self._acall(request)
+        perf.install_db_wrapper(connection)
+        timings, token = perf.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            perf.finish(token)
+        return self._finish(request, response, timings)
+
+    async def _acall(self, request):
+        timings, token = perf.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            perf.finish(token)
+        return self._finish(request, response, timings)
+
+    def _finish(self, request, response, timings):
+        total_ms = timings.elapsed_ms()
+        response['Server-Timing'] = timings.server_timing(total_ms)
+
+        match = request.resolver_match
+        url_name = match.url_name if match else None
+        # a stream's "duration" is only its time to first byte
+        if url_name and not response.streaming:
+            perf.observe(url_name, total_ms, timings)
+
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'url_name': url_name,
+            'status': response.status_code,
+            'ms': round(total_ms, 1),
+            **{kind: {'count': count, 'ms': round(ms, 1)}
+               for kind, (count, ms) in timings.calls.items()},
+        }))
+        return response
+
+
+class GZipMiddleware(gzip.GZipMiddleware):
+    """Django's GZipMiddleware, except for event streams, which must reach the client unbuffered."""
+
+    def process_response(self, request, response):
+        if response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+        return super().process_response(request, response)
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise, but async-capable. Stock WhiteNoiseMiddleware is sync-only,
+    so under ASGI Django adapts every layer below it to sync and the async
+    views each end up holding a thread again. Finding a file is a dict
+    lookup either way; only the file body is read in a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self._acall(request)
+        return super().__call__(request)
+
+    async def _acall(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is None:
+            return await self.get_response(request)
+        response = self.serve(static_file, request)
+        file = response.file_to_stream
+        if file is not None:  # None for HEAD and 304s
+            # an async iterator, so Django doesn't buffer the file to adapt it
+            response.streaming_content = _read_in_thread(file, response.block_size)
+        return response
+
+
+async def _read_in_thread(file, block_size):
+    read = sync_to_async(file.read, thread_sensitive=False)
+    while chunk := await read(block_size):
+        yield chunk
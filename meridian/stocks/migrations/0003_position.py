@@ -0,0 +1,51 @@
+# Generated by Django 6.0.2 on 2026-10-18 02:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def build_positions(apps, schema_editor):
+    # Same average-cost replay as `manage.py rebuild_positions`
+    Holding = apps.get_model('stocks', 'Holding')
+    Position = apps.get_model('stocks', 'Position')
+    totals = {}
+    for lot in Holding.objects.order_by('bought_at', 'id').iterator():
+        shares, cost = totals.get((lot.user_id, lot.ticker), (0, 0))
+        if lot.shares >= 0:
+            shares, cost = shares + lot.shares, cost + lot.shares * lot.buy_price
+        elif -lot.shares >= shares:
+            shares, cost = 0, 0
+        else:
+            cost -= cost / shares * -lot.shares
+            shares += lot.shares
+        totals[(lot.user_id, lot.ticker)] = (shares, cost)
+    Position.objects.bulk_create([
+        Position(user_id=user_id, ticker=ticker, shares=shares, cost_basis=cost)
+        for (user_id, ticker), (shares, cost) in totals.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stocks', '0002_pricebar'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Position',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticker', models.CharField(max_length=10)),
+                ('shares', models.FloatField(default=0)),
+                ('cost_basis', models.FloatField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='positions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'ticker'), name='unique_position_user_ticker')],
+            },
+        ),
+        migrations.RunPython(build_positions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:00
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Round
+
+
+def round_to_cents(apps, schema_editor):
+    # SQLite keeps the old REAL values through the column change
+    apps.get_model('stocks', 'Holding').objects.update(buy_price=Round('buy_price', 2))
+    apps.get_model('stocks', 'Transaction').objects.update(
+        price=Round('price', 2), total=Round('total', 2))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stocks', '0004_storysummary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='holding',
+            name='buy_price',
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='price',
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='total',
+            field=models.DecimalField(decimal_places=2, max_digits=14),
+        ),
+        migrations.RunPython(round_to_cents, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='holding',
+            index=models.Index(fields=['user', 'ticker'], name='holding_user_ticker_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'created_at'], name='txn_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'action', 'total'], name='txn_user_action_total_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'ticker', 'action', 'created_at'], name='txn_user_ticker_action_idx'),
+        ),
+    ]
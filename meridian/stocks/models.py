@@ -5,9 +5,49 @@ class Holding(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     ticker = models.CharField(max_length=10)
     shares = models.FloatField()
-    buy_price = models.FloatField()
+    buy_price = models.DecimalField(max_digits=12, decimal_places=2)
     bought_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'ticker'], name='holding_user_ticker_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} — {self.ticker} x{self.shares}"
+
+class Position(models.Model):
+    """
+    Running total of a user's Holding lots for one ticker, updated in the
+    same transaction as each trade. Cost basis uses the average-cost method,
+    so a sell removes shares at the position's current average price.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='positions')
+    ticker = models.CharField(max_length=10)
+    shares = models.FloatField(default=0)
+    cost_basis = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'ticker'], name='unique_position_user_ticker'),
+        ]
+
+    @property
+    def avg_price(self):
+        return self.cost_basis / self.shares if self.shares else 0
+
+    def add(self, shares, price):
+        self.shares += shares
+        self.cost_basis += shares * price
+
+    def remove(self, shares):
+        if shares >= self.shares:
+            self.shares = 0
+            self.cost_basis = 0
+        else:
+            self.cost_basis -= self.avg_price * shares
+            self.shares -= shares
+
     def __str__(self):
         return f"{self.user.username} — {self.ticker} x{self.shares}"
 
@@ -20,9 +60,69 @@ class Transaction(models.Model):
     ticker = models.CharField(max_length=10)
     action = models.CharField(max_length=4, choices=ACTION_CHOICES)
     shares = models.FloatField()
-    price = models.FloatField()
-    total = models.FloatField()
+    price = models.DecimalField(max_digits=12, decimal_places=2)
+    total = models.DecimalField(max_digits=14, decimal_places=2)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # the ledger, newest or oldest first, without a sort step
+            models.Index(fields=['user', 'created_at'], name='txn_user_created_idx'),
+            # covers the buy/sell summary, so it never reads the table
+            models.Index(fields=['user', 'action', 'total'], name='txn_user_action_total_idx'),
+            models.Index(fields=['user', 'ticker', 'action', 'created_at'], name='txn_user_ticker_action_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} {self.action} {self.shares} {self.ticker}"
+
+class WatchlistItem(models.Model):
+    """A ticker the user keeps on their dashboard."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='watchlist')
+    ticker = models.CharField(max_length=10)
+    added_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['added_at', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'ticker'], name='unique_watchlist_user_ticker'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} watching {self.ticker}"
+
+class PriceBar(models.Model):
+    """One daily OHLCV bar, kept locally so history isn't re-downloaded."""
+    ticker = models.CharField(max_length=10)
+    date = models.DateField()
+    open = models.FloatField()
+    high = models.FloatField()
+    low = models.FloatField()
+    close = models.FloatField()
+    volume = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ['ticker', 'date']
+        constraints = [
+            models.UniqueConstraint(fields=['ticker', 'date'], name='unique_pricebar_ticker_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.ticker} {self.date} {self.close}"
+
+
+class StorySummary(models.Model):
+    """Cached Gemini explanation for a (ticker, day window, headlines) combination."""
+    ticker = models.CharField(max_length=10)
+    days = models.PositiveIntegerField()
+    headlines_hash = models.CharField(max_length=40)
+    summary = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['ticker', 'days', 'headlines_hash'], name='unique_story_key'),
+        ]
+
     def __str__(self):
-        return f"{self.user.username} {self.action} {self.shares} {self.ticker}"
\ No newline at end of file
+        return f"{self.ticker} {self.days}d {self.headlines_hash[:8]}"
@@ -0,0 +1,149 @@
+"""
+Per-request timing breakdown.
+
+PerformanceMiddleware (stocks/middleware.py) opens a RequestTimings for
+each request in a context variable. Every DB query (via a connection
+execute wrapper) and every upstream call wrapped in ``timed(kind)`` adds
+its count and latency to it. The context variable follows the request
+into sync_to_async threads, so async views are covered too. Finished
+requests are kept in a rolling window per URL name for ``stats()``.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+WINDOW_SECONDS = getattr(settings, 'PERF_WINDOW_SECONDS', 15 * 60)
+MAX_SAMPLES = getattr(settings, 'PERF_MAX_SAMPLES', 1000)
+# Histogram bucket upper bounds, in milliseconds
+BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class RequestTimings:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.calls = {}  # kind -> [count, total ms]
+        self._lock = threading.Lock()
+
+    def add(self, kind, ms):
+        with self._lock:
+            entry = self.calls.setdefault(kind, [0, 0.0])
+            entry[0] += 1
+            entry[1] += ms
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self, total_ms):
+        parts = [f'total;dur={total_ms:.1f}']
+        for kind, (count, ms) in sorted(self.calls.items()):
+            unit = 'queries' if kind == 'db' else 'calls'
+            parts.append(f'{kind};dur={ms:.1f};desc="{count} {unit}"')
+        return ', '.join(parts)
+
+
+_current = ContextVar('request_timings', default=None)
+
+
+def start():
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def finish(token):
+    _current.reset(token)
+
+
+@contextmanager
+def timed(kind):
+    """Charge the time spent in the block to the current request, if any."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(kind, (time.perf_counter() - t0) * 1000)
+
+
+def record_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    t0 = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add('db', (time.perf_counter() - t0) * 1000)
+
+
+def install_db_wrapper(connection, **kwargs):
+    """``connection_created`` receiver: time every query on ``connection``."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+# ── Rolling histograms ────────────────────────────────────
+
+_samples = {}
+_samples_lock = threading.Lock()
+
+
+def observe(url_name, total_ms, timings):
+    sample = (time.monotonic(), total_ms,
+              {kind: tuple(v) for kind, v in timings.calls.items()})
+    with _samples_lock:
+        window = _samples.get(url_name)
+        if window is None:
+            window = _samples[url_name] = deque(maxlen=MAX_SAMPLES)
+        window.append(sample)
+
+
+def _percentile(ordered, q):
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+
+
+def _summarize(samples):
+    ordered = sorted(s[1] for s in samples)
+    buckets = [0] * (len(BUCKETS_MS) + 1)
+    for ms in ordered:
+        buckets[bisect_left(BUCKETS_MS, ms)] += 1
+    calls = {}
+    for _, _, breakdown in samples:
+        for kind, (count, ms) in breakdown.items():
+            entry = calls.setdefault(kind, [0, 0.0])
+            entry[0] += count
+            entry[1] += ms
+    n = len(samples)
+    return {
+        'count': n,
+        'p50_ms': _percentile(ordered, 0.50),
+        'p95_ms': _percentile(ordered, 0.95),
+        'p99_ms': _percentile(ordered, 0.99),
+        'mean_ms': round(sum(ordered) / n, 1),
+        'histogram': {f'le_{b}ms': c for b, c in zip(BUCKETS_MS, buckets)} | {'gt_10000ms': buckets[-1]},
+        # per request, averaged over the window
+        'calls': {kind: {'count': round(count / n, 2), 'ms': round(ms / n, 1)}
+                  for kind, (count, ms) in sorted(calls.items())},
+    }
+
+
+def stats():
+    """Latency summary per URL name over the last WINDOW_SECONDS."""
+    cutoff = time.monotonic() - WINDOW_SECONDS
+    with _samples_lock:
+        windows = {name: [s for s in window if s[0] >= cutoff] for name, window in _samples.items()}
+    return {name: _summarize(samples) for name, samples in sorted(windows.items()) if samples}
+
+
+def clear():
+    with _samples_lock:
+        _samples.clear()
@@ -0,0 +1,110 @@
+"""
+Background pre-warming of prices for held and popular tickers.
+
+Every pass collects the tickers anyone holds or watches plus the
+dashboard's default list. It refreshes their quotes and daily bars with
+a few batched downloads and caches them for longer than the gap to the
+next pass. Request handlers then read warm data instead of paying the
+upstream latency on a miss.
+
+Passes run every PREWARM_INTERVAL seconds while NYSE is open and every
+PREWARM_IDLE_INTERVAL outside the session, but never sleep through the
+opening bell. Each wait is jittered so several workers don't hit
+upstream in lockstep. Exchange holidays count as trading days.
+"""
+import logging
+import random
+import threading
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db import connection
+
+from . import history_store, market_data, quotes
+from .models import Position, WatchlistItem
+
+
+logger = logging.getLogger('stocks.prewarm')
+
+INTERVAL = getattr(settings, 'PREWARM_INTERVAL', 45)
+IDLE_INTERVAL = getattr(settings, 'PREWARM_IDLE_INTERVAL', 15 * 60)
+JITTER = getattr(settings, 'PREWARM_JITTER', 0.2)
+
+MARKET_TZ = ZoneInfo('America/New_York')
+MARKET_OPEN, MARKET_CLOSE = time(9, 30), time(16, 0)
+# get_closes periods read by api_portfolio and the dashboard quotes
+QUOTE_PERIODS = ['2d', '5d']
+
+
+def tickers():
+    """Every ticker held or watched by anyone, plus the default watchlist."""
+    held = Position.objects.filter(shares__gt=0).values_list('ticker', flat=True).distinct()
+    watched = WatchlistItem.objects.values_list('ticker', flat=True).distinct()
+    return sorted({*held, *watched, *quotes.DEFAULT_WATCHLIST})
+
+
+def market_open(now):
+    now = now.astimezone(MARKET_TZ)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+def seconds_until_open(now):
+    now = now.astimezone(MARKET_TZ)
+    opening = datetime.combine(now.date(), MARKET_OPEN, tzinfo=MARKET_TZ)
+    if now >= opening:
+        opening += timedelta(days=1)
+    while opening.weekday() >= 5:
+        opening += timedelta(days=1)
+    return (opening - now).total_seconds()
+
+
+def next_delay(now=None):
+    """Seconds until the next pass."""
+    now = now or datetime.now(MARKET_TZ)
+    if market_open(now):
+        return INTERVAL * random.uniform(1 - JITTER, 1 + JITTER)
+    delay = IDLE_INTERVAL * random.uniform(1 - JITTER, 1 + JITTER)
+    # wake just after the open, spread over one trading-hours interval
+    return min(delay, seconds_until_open(now) + random.uniform(0, INTERVAL))
+
+
+def run_once(ttl):
+    """One refresh pass; everything it fetches stays cached for ``ttl`` seconds."""
+    names = tickers()
+    for period in QUOTE_PERIODS:
+        market_data.prime_closes(names, period, ttl)
+    history_store.prime(names, ttl)
+    return names
+
+
+def run_forever(stop, on_pass=None):
+    """Refresh until ``stop`` (a threading.Event) is set."""
+    while not stop.is_set():
+        delay = next_delay()
+        try:
+            # cache past the next pass, so a slow or failed one doesn't leave gaps
+            names = run_once(ttl=2 * delay + 30)
+            if on_pass:
+                on_pass(names, delay)
+        except Exception:
+            logger.exception('Price pre-warm pass failed')
+        finally:
+            connection.close()
+        stop.wait(delay)
+
+
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def start():
+    """Start the background refresh thread in this process, if PREWARM_PRICES is on."""
+    global _thread
+    if not getattr(settings, 'PREWARM_PRICES', False):
+        return
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=run_forever, args=(threading.Event(),),
+                                       name='price-prewarm', daemon=True)
+            _thread.start()
@@ -0,0 +1,49 @@
+"""
+Price cards (name, price, day change) for many tickers at once.
+
+Everything comes from one batched ``get_closes`` lookup plus the local
+symbol index for names, so a grid of cards costs a single upstream round
+trip however many tickers it shows.
+"""
+import re
+
+from . import market_data, symbols
+
+
+MAX_TICKERS = 50
+DEFAULT_WATCHLIST = ['AAPL', 'TSLA', 'NVDA', 'MSFT', 'AMZN', 'GOOGL', 'META', 'SPY']
+
+TICKER_RE = re.compile(r'[A-Z.\-^]{1,10}')
+
+
+def parse_tickers(raw):
+    """Upper-cased, de-duplicated tickers from a comma-separated string."""
+    tickers = [t.strip().upper() for t in raw.split(',')]
+    return list(dict.fromkeys(t for t in tickers if TICKER_RE.fullmatch(t)))[:MAX_TICKERS]
+
+
+def get_quotes(tickers, names=None):
+    """
+    Quotes for ``tickers`` in the given order. Tickers with no price data
+    are left out. ``names`` overrides the display name per ticker.
+    """
+    closes = market_data.get_closes(tickers, period='5d')
+    known = symbols.get_index().names
+    names = names or {}
+    quotes = []
+    for ticker in tickers:
+        if ticker not in closes:
+            continue
+        history = closes[ticker].dropna()
+        if history.empty:
+            continue
+        current = round(float(history.iloc[-1]), 2)
+        prev = round(float(history.iloc[-2]), 2) if len(history) > 1 else current
+        quotes.append({
+            'ticker': ticker,
+            'name': names.get(ticker) or known.get(ticker, ticker),
+            'current_price': current,
+            'change': round(current - prev, 2),
+            'change_pct': round(((current - prev) / prev) * 100, 2) if prev else 0,
+        })
+    return quotes
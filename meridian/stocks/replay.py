@@ -0,0 +1,119 @@
+"""
+Historically correct share counts, replayed from the Transaction ledger.
+
+A LedgerReplay walks a user's trades in order and records the net share
+change per ticker for each trading day. Every CHECKPOINT_DAYS it also
+stores a full snapshot, so "what did I hold on date D" is a bisect to the
+nearest checkpoint plus at most CHECKPOINT_DAYS of deltas. Replays are
+cached per user and extended with only the trades made since the last
+lookup.
+"""
+import threading
+from bisect import bisect_right
+
+import pandas as pd
+from django.conf import settings
+
+from .market_data import TTLCache
+from .models import Transaction
+
+
+CHECKPOINT_DAYS = getattr(settings, 'REPLAY_CHECKPOINT_DAYS', 30)
+REPLAY_TTL = 60 * 60
+
+
+class LedgerReplay:
+
+    def __init__(self, user_id, checkpoint_days=CHECKPOINT_DAYS):
+        self.user_id = user_id
+        self.checkpoint_days = checkpoint_days
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.last_txn_id = 0
+        self.days = []          # trade days, ascending
+        self.deltas = []        # per trade day: {ticker: net share change}
+        self.checkpoints = []   # (index into days, {ticker: shares} after that day)
+        self._checkpoint_index = []  # the index half of each checkpoint, for bisect
+        self.holdings = {}      # shares after the latest trade
+
+    def _apply(self, day, ticker, change):
+        if not self.days or self.days[-1] != day:
+            self.days.append(day)
+            self.deltas.append({})
+        delta = self.deltas[-1]
+        delta[ticker] = delta.get(ticker, 0) + change
+        self.holdings[ticker] = self.holdings.get(ticker, 0) + change
+
+    def _maybe_checkpoint(self):
+        index = len(self.days) - 1
+        if self._checkpoint_index and self._checkpoint_index[-1] == index:
+            # later trade on a checkpoint day: keep the snapshot at the day's close
+            self.checkpoints[-1] = (index, dict(self.holdings))
+            return
+        last_day = self.days[self._checkpoint_index[-1]] if self.checkpoints else None
+        if last_day is None or (self.days[-1] - last_day).days >= self.checkpoint_days:
+            self.checkpoints.append((index, dict(self.holdings)))
+            self._checkpoint_index.append(index)
+
+    def _fold_new(self):
+        """Apply trades since last_txn_id. False if one is back-dated."""
+        new = list(Transaction.objects
+                   .filter(user_id=self.user_id, id__gt=self.last_txn_id)
+                   .order_by('id')
+                   .values_list('id', 'created_at', 'ticker', 'action', 'shares'))
+        # ids needn't follow created_at when trades commit concurrently
+        new.sort(key=lambda row: (row[1], row[0]))
+        for txn_id, created_at, ticker, action, shares in new:
+            day = created_at.date()
+            if self.days and day < self.days[-1]:
+                return False
+            self._apply(day, ticker, shares if action == Transaction.BUY else -shares)
+            self._maybe_checkpoint()
+            self.last_txn_id = max(self.last_txn_id, txn_id)
+        return True
+
+    def extend(self):
+        """Fold in any trades recorded since the last call."""
+        with self._lock:
+            if not self._fold_new():
+                # back-dated row: start over rather than splice it in
+                self._reset()
+                self._fold_new()
+        return self
+
+    def shares_on(self, day):
+        """{ticker: shares} held at the close of ``day``."""
+        n = bisect_right(self.days, day)
+        if n == 0:
+            return {}
+        c = bisect_right(self._checkpoint_index, n - 1) - 1
+        index, snapshot = self.checkpoints[c]
+        held = dict(snapshot)
+        for delta in self.deltas[index + 1:n]:
+            for ticker, change in delta.items():
+                held[ticker] = held.get(ticker, 0) + change
+        return {t: s for t, s in held.items() if s > 1e-9}
+
+    def share_frame(self, index, tickers):
+        """Shares held at the close of each date in ``index`` (dates x tickers)."""
+        if not self.days:
+            return pd.DataFrame(0.0, index=index, columns=tickers)
+        changes = pd.DataFrame(self.deltas, index=pd.DatetimeIndex(self.days))
+        changes = changes.reindex(columns=tickers).fillna(0.0).cumsum()
+        # everything traded before the window is folded into its first row
+        return (changes.reindex(changes.index.union(index)).ffill()
+                .reindex(index).fillna(0.0).clip(lower=0))
+
+    @property
+    def tickers(self):
+        return sorted({t for delta in self.deltas for t in delta})
+
+
+_replays = TTLCache(max_entries=getattr(settings, 'REPLAY_MAX_USERS', 1024))
+
+
+def for_user(user_id):
+    replay = _replays.get_or_fetch(('replay', user_id), REPLAY_TTL, lambda: LedgerReplay(user_id))
+    return replay.extend()
@@ -0,0 +1,178 @@
+"""
+Deadlines, circuit breakers and hedged retries for upstream calls.
+
+``call(host, fn, ...)`` runs ``fn`` on a shared worker pool and gives up
+once its deadline passes, whether or not the attempt ever returns. If the
+first attempt is slower than ``hedge_after``, or fails with a transient
+error (connection trouble, a timeout, HTTP 429 or 5xx), one duplicate is
+started and whichever answers first wins, which trims the tail latency of
+idempotent reads. Other errors are raised straight away.
+
+Each host has a circuit breaker. After BREAKER_FAILURES consecutive
+transient failures or timeouts it opens, and calls fail at once with CircuitOpen
+instead of queueing behind a dead upstream. After BREAKER_RESET seconds a
+single trial call is let through, and its result closes or re-opens the
+breaker. Callers catch ``Unavailable`` and fall back to the last known
+good value.
+"""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+
+DEADLINE = getattr(settings, 'UPSTREAM_DEADLINE', 5.0)
+BULK_DEADLINE = getattr(settings, 'UPSTREAM_BULK_DEADLINE', 20.0)
+HEDGE_AFTER = getattr(settings, 'UPSTREAM_HEDGE_AFTER', 1.5)
+BREAKER_FAILURES = getattr(settings, 'UPSTREAM_BREAKER_FAILURES', 5)
+BREAKER_RESET = getattr(settings, 'UPSTREAM_BREAKER_RESET', 30.0)
+
+
+class Unavailable(Exception):
+    """The upstream could not answer in time, or is known to be down."""
+
+
+class CircuitOpen(Unavailable):
+    pass
+
+
+class DeadlineExceeded(Unavailable):
+    pass
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, host, failures=BREAKER_FAILURES, reset_after=BREAKER_RESET):
+        self.host = host
+        self.max_failures = failures
+        self.reset_after = reset_after
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go out now. Lets one trial through once the reset time passes."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_after:
+                self.state = self.HALF_OPEN
+                return True
+            self.rejected += 1
+            return False
+
+    def success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.max_failures:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return {'state': self.state, 'failures': self.failures, 'rejected': self.rejected}
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+# An attempt abandoned at its deadline keeps its worker until ``fn``
+# returns, so ``fn`` must bound itself (a socket timeout) and this pool has
+# to cover the abandoned attempts as well as the live ones.
+_pool = ThreadPoolExecutor(max_workers=getattr(settings, 'UPSTREAM_MAX_WORKERS', 32),
+                           thread_name_prefix='upstream')
+
+
+def breaker(host):
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host)
+        return _breakers[host]
+
+
+def is_transient(error, extra=()):
+    """
+    Whether a retry of the same request could reasonably succeed. ``extra``
+    adds client-specific types, such as a library's rate-limit error.
+    """
+    if isinstance(error, extra):
+        return True
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status is not None:
+        return status == 429 or status >= 500
+    # requests' connection errors and timeouts are OSErrors too
+    return isinstance(error, (OSError, TimeoutError))
+
+
+def call(host, fn, *args, deadline=None, hedge_after=None, transient=(), **kwargs):
+    """
+    ``fn(*args, **kwargs)`` against ``host``, guarded by its breaker and
+    a ``deadline`` in seconds. Pass ``hedge_after`` only for idempotent
+    calls. Only timeouts and transient errors (see is_transient, plus the
+    ``transient`` types) count against the breaker. Raises CircuitOpen
+    without calling ``fn`` while the breaker is open, DeadlineExceeded when
+    no attempt finishes in time, and otherwise the error of the last failed
+    attempt. Attempts still running at the
+    deadline are not cancelled; they hold a pool worker until ``fn``
+    returns on its own.
+    """
+    deadline = DEADLINE if deadline is None else deadline
+    guard = breaker(host)
+    if not guard.allow():
+        raise CircuitOpen(f'{host} is failing; not calling it for now')
+
+    started = time.monotonic()
+    attempts = {_pool.submit(fn, *args, **kwargs)}
+    hedged = hedge_after is None
+    error = None
+    while attempts:
+        elapsed = time.monotonic() - started
+        if elapsed >= deadline:
+            break
+        timeout = deadline - elapsed
+        if not hedged:
+            timeout = min(timeout, max(hedge_after - elapsed, 0))
+        done, attempts = wait(attempts, timeout=timeout, return_when=FIRST_COMPLETED)
+        for attempt in done:
+            try:
+                result = attempt.result()
+            except Exception as e:
+                error = e
+            else:
+                guard.success()
+                return result
+        if done and not is_transient(error, transient):
+            break
+        # the first attempt is slow or hit a transient error: start one more
+        if not hedged and (done or time.monotonic() - started >= hedge_after):
+            attempts.add(_pool.submit(fn, *args, **kwargs))
+            hedged = True
+
+    if error is not None and not is_transient(error, transient):
+        # the host did answer: a 404 or an unparseable body for one symbol
+        # says nothing about its health, so it doesn't count as a failure
+        guard.success()
+        raise error
+    guard.failure()
+    if error is None or attempts:
+        raise DeadlineExceeded(f'{host} did not answer within {deadline:g}s')
+    raise error
+
+
+def stats():
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {host: b.stats() for host, b in sorted(breakers.items())}
+
+
+def reset():
+    with _breakers_lock:
+        _breakers.clear()
@@ -0,0 +1,64 @@
+  // ── Balance ───────────────────────────────────────────────────
+  fetch('/stocks/api/user/').then(r=>r.json()).then(d=>{
+    document.getElementById('navBalance').textContent = '$' + d.balance.toLocaleString('en-US',{minimumFractionDigits:2,maximumFractionDigits:2});
+  });
+
+  // ── Welcome Banner ────────────────────────────────────────────
+document.addEventListener("DOMContentLoaded", function() {
+  const banner = document.getElementById('welcomeBanner');
+  const skipBtn = document.querySelector('.welcome-skip');
+  const dismissBtn = document.querySelector('.welcome-dismiss');
+
+  if (!localStorage.getItem('meridian_banner_dismissed')) {
+    banner.style.display = 'block';
+  }
+
+  function hideBanner() {
+    banner.style.display = 'none';
+    localStorage.setItem('meridian_banner_dismissed', '1');
+  }
+
+  skipBtn.addEventListener('click', hideBanner);
+  dismissBtn.addEventListener('click', hideBanner);
+});
+
+  // ── Search ────────────────────────────────────────────────────
+  let searchTimer;
+  const inp = document.getElementById('searchInput');
+  const drop = document.getElementById('searchDrop');
+  const toggle = document.getElementById('menuToggle');
+  const menu = document.getElementById('navMenu');
+
+  toggle.addEventListener('click', () => {
+    menu.classList.toggle('active');
+  });
+  inp.addEventListener('input', () => {
+    clearTimeout(searchTimer);
+    const q = inp.value.trim();
+    if (!q) { drop.style.display='none'; return; }
+    searchTimer = setTimeout(async () => {
+      try {
+        const res = await fetch(`/stocks/api/search/${encodeURIComponent(q)}/`);
+        if (!res.ok) { drop.style.display='none'; return; }
+        const d = await res.json();
+        if (d.error) { drop.style.display='none'; return; }
+        drop.innerHTML = (d.results || [d]).map(r => {
+          const pos = r.change_pct >= 0;
+          return `<div class="search-item" onclick="window.location='/stocks/stock/${r.ticker}/'">
+          <div>
+            <div style="font-weight:700;font-family:var(--font-mono);font-size:13px;color:var(--text)">${r.ticker}</div>
+            <div style="font-size:11px;color:var(--text2);margin-top:2px">${r.name}</div>
+          </div>
+          <div style="text-align:right">
+            <div style="font-family:var(--font-mono);font-size:13px;color:var(--text)">$${r.current_price}</div>
+            <div style="font-size:11px;color:${pos?'var(--green)':'var(--red)'}">${pos?'+':''}${r.change_pct}%</div>
+          </div>
+        </div>`;
+        }).join('');
+        drop.style.display='block';
+      } catch {
+        drop.style.display='none';
+      }
+    }, 400);
+  });
+  document.addEventListener('click', e => { if (!e.target.closest('.search-wrap')) drop.style.display='none'; });
@@ -0,0 +1,76 @@
+// ───────── BALANCE ─────────
+fetch('/stocks/api/user/')
+  .then(r => r.json())
+  .then(d => {
+    const balanceEl = document.getElementById('heroBalance');
+    const subEl     = document.getElementById('heroBalanceSub');
+
+    balanceEl.textContent =
+      '$' + d.balance.toLocaleString('en-US', {
+        minimumFractionDigits:2,
+        maximumFractionDigits:2
+      });
+
+    const diff = d.balance - 100000;
+    const pos  = diff >= 0;
+
+    subEl.textContent =
+      `${pos ? 'Up' : 'Down'} $${Math.abs(diff).toLocaleString('en-US', {
+        minimumFractionDigits:2,
+        maximumFractionDigits:2
+      })} from starting balance`;
+
+    subEl.style.color = pos ? 'var(--green)' : 'var(--red)';
+  });
+
+
+// ───────── STOCK GRID ─────────
+// One request prices the whole grid: the user's watchlist, or the
+// popular list until they watch something.
+const grid = document.getElementById('stockGrid');
+
+function stockCard(d) {
+  const pos = d.change_pct >= 0;
+  const color  = pos ? 'var(--green)' : 'var(--red)';
+  const glow   = pos ? 'rgba(63,185,80,0.15)' : 'rgba(248,81,73,0.15)';
+  const border = pos ? 'rgba(63,185,80,0.2)'  : 'rgba(248,81,73,0.15)';
+
+  return `
+    <a href="/stocks/stock/${d.ticker}/"
+       class="stock-card"
+       style="border:1px solid ${border}"
+       aria-label="${d.name} stock. Current price $${d.current_price}. ${pos ? 'Up' : 'Down'} ${Math.abs(d.change_pct)} percent today">
+
+      <div class="card-glow" style="background:${glow}"></div>
+
+      <div class="card-ticker">${d.ticker}</div>
+      <div style="font-size:12px;color:var(--text);margin-top:3px">
+        ${d.name}
+      </div>
+
+      <div class="card-price">
+        $${d.current_price.toLocaleString()}
+      </div>
+
+      <div style="font-family:var(--font-mono);
+                  font-size:13px;
+                  color:${color};
+                  margin-top:4px;">
+        ${pos ? 'Up' : 'Down'} ${Math.abs(d.change_pct)}% today
+      </div>
+
+    </a>
+  `;
+}
+
+fetch('/stocks/api/quotes/')
+  .then(r => r.json())
+  .then(d => {
+    if (!d.quotes) return;
+    if (d.watchlist) {
+      document.getElementById('popular-heading').textContent = 'Your Watchlist';
+      document.getElementById('popular-sub').textContent =
+        'Stocks you are watching. Add more from any stock page.';
+    }
+    grid.innerHTML = d.quotes.map(stockCard).join('');
+  });
@@ -0,0 +1,313 @@
+function fmt(n) {
+  return n != null ? n.toLocaleString('en-US', { minimumFractionDigits:2, maximumFractionDigits:2 }) : '—';
+}
+
+// ── Portfolio Summary ─────────────────────────────────────────────
+
+fetch('/stocks/api/portfolio/').then(r => r.json()).then(d => {
+  const gPos = d.overall_gain >= 0;
+
+  document.getElementById('summaryCards').innerHTML = [
+    ['Total Value',    `$${fmt(d.total_value)}`,                'var(--text)'],
+    ['Cash Available', `$${fmt(d.balance)}`,                    'var(--accent)'],
+    ['Invested',       `$${fmt(d.invested_value)}`,             'var(--text)'],
+    ['Total Gain',     `${gPos?'+':''}$${fmt(d.overall_gain)}`, gPos?'var(--green)':'var(--red)'],
+    ['Return %',       `${gPos?'+':''}${d.overall_gain_pct}%`,  gPos?'var(--green)':'var(--red)'],
+  ].map(([l, v, c]) => `
+    <div class="sum-card">
+      <div class="sum-label">${l}</div>
+      <div class="sum-val" style="color:${c}">${v}</div>
+    </div>`).join('');
+
+  if (!d.holdings.length) {
+    document.getElementById('holdingsWrap').innerHTML = `
+      <div style="padding:60px;text-align:center;background:var(--bg2);border:1px solid var(--border);border-radius:12px;color:var(--text2)">
+        <div style="font-size:40px;margin-bottom:12px">📭</div>
+        <div style="font-weight:700;margin-bottom:6px">No holdings yet</div>
+        <div style="font-size:14px;margin-bottom:16px">Search for a stock and make your first investment.</div>
+        <a href="/stocks/" style="display:inline-block;padding:10px 24px;background:var(--accent2);color:#fff;border-radius:8px;font-weight:700;text-decoration:none">Browse Stocks →</a>
+      </div>`;
+    document.getElementById('ttEmpty').style.display = 'block';
+    return;
+  }
+
+  document.getElementById('holdingsWrap').innerHTML = `
+    <div style="font-weight:700;font-size:20px;margin-bottom:14px">Current Holdings</div>
+    ${d.stale ? `<div style="font-size:13px;color:var(--text2);margin:-6px 0 14px">
+      Live prices are unavailable right now. Prices marked * are the last known ones.</div>` : ''}
+    <div style="overflow-x:auto">
+      <table>
+        <thead>
+          <tr>
+            <th>Ticker</th>
+            <th>Shares</th>
+            <th>Avg Cost</th>
+            <th>Current Price</th>
+            <th>Market Value</th>
+            <th>Gain / Loss</th>
+            <th>%</th>
+          </tr>
+        </thead>
+        <tbody>
+          ${d.holdings.map(h => {
+            const pos = h.gain_loss >= 0;
+            const c   = pos ? 'var(--green)' : 'var(--red)';
+            return `<tr onclick="window.location='/stocks/stock/${h.ticker}/'">
+              <td><span style="font-weight:700;background:var(--bg3);padding:3px 8px;border-radius:5px;font-family:var(--font-mono)">${h.ticker}</span></td>
+              <td>${h.shares}</td>
+              <td>$${fmt(h.avg_price)}</td>
+              <td>$${fmt(h.current_price)}${h.stale ? '<span style="color:var(--text3)"> *</span>' : ''}</td>
+              <td style="font-weight:700">$${fmt(h.market_value)}</td>
+              <td style="color:${c};font-weight:700">${pos?'+':''}$${fmt(h.gain_loss)}</td>
+              <td style="color:${c};font-weight:700">${pos?'+':''}${h.gain_loss_pct}%</td>
+            </tr>`;
+          }).join('')}
+        </tbody>
+      </table>
+    </div>`;
+});
+
+// ── Time Machine ──────────────────────────────────────────────────
+
+function updateSliderLabel(days) {
+  days = parseInt(days);
+  const label = document.getElementById('sliderLabel');
+  if      (days === 0)  label.textContent = 'Today';
+  else if (days === 1)  label.textContent = '1 day ago';
+  else if (days < 30)   label.textContent = `${days} days ago`;
+  else if (days < 60)   label.textContent = '~1 month ago';
+  else if (days < 335)  label.textContent = `~${Math.round(days/30)} months ago`;
+  else                  label.textContent = '1 year ago';
+
+  [0, 7, 30, 90, 180, 365].forEach(p => {
+    const btn = document.getElementById(`preset-${p}`);
+    if (btn) btn.classList.toggle('active', p === days);
+  });
+}
+
+function setPreset(days) {
+  document.getElementById('timeSlider').value = days;
+  updateSliderLabel(days);
+  runTimeTravel(days);
+}
+
+// The whole year of daily values is fetched once; the slider is then
+// answered locally from it.
+let ttCurve = null;
+
+function loadCurve() {
+  if (!ttCurve) ttCurve = fetch('/stocks/api/timetravel/curve/?days=365').then(r => r.json());
+  return ttCurve;
+}
+
+function r2(n) { return Math.round(n * 100) / 100; }
+
+function timeTravelAt(curve, days) {
+  const target = new Date();
+  target.setDate(target.getDate() - days);
+  const iso = target.toISOString().slice(0, 10);
+
+  // last trading day on or before the target date
+  let lo = 0, hi = curve.dates.length - 1, i = -1;
+  while (lo <= hi) {
+    const mid = (lo + hi) >> 1;
+    if (curve.dates[mid] <= iso) { i = mid; lo = mid + 1; } else { hi = mid - 1; }
+  }
+  const last = curve.dates.length - 1;
+
+  let totalThen = 0, totalNow = 0;
+  const holdings = [];
+  if (i >= 0) {
+    curve.tickers.forEach(t => {
+      const priceThen = curve.prices[t][i];
+      const priceNow  = curve.prices[t][last];
+      if (priceThen == null || priceNow == null) return;
+      // share counts as of each date, replayed from the trade ledger
+      const shares    = curve.shares[t][i];
+      const sharesNow = curve.shares[t][last];
+      if (!shares && !sharesNow) return;
+      const valueThen = r2(priceThen * shares);
+      const valueNow  = r2(priceNow * sharesNow);
+      const gain      = r2(valueNow - valueThen);
+      totalThen += valueThen;
+      totalNow  += valueNow;
+      holdings.push({
+        ticker: t, shares, shares_now: sharesNow, price_then: priceThen, price_now: priceNow,
+        value_then: valueThen, value_now: valueNow, gain,
+        gain_pct: valueThen ? r2(gain / valueThen * 100) : 0,
+      });
+    });
+  }
+  const totalGain = r2(totalNow - totalThen);
+  return {
+    days_ago: days,
+    date: target.toLocaleDateString('en-US', { month: 'short', day: '2-digit', year: 'numeric' }),
+    total_then: r2(totalThen),
+    total_now: r2(totalNow),
+    total_gain: totalGain,
+    total_gain_pct: totalThen ? r2(totalGain / totalThen * 100) : 0,
+    holdings,
+  };
+}
+
+async function runTimeTravel(days) {
+  days = parseInt(days);
+
+  if (days === 0) {
+    document.getElementById('timeTravelResult').style.display = 'none';
+    document.getElementById('ttLoading').style.display = 'none';
+    document.getElementById('ttEmpty').style.display = 'none';
+    return;
+  }
+
+  if (!ttCurve) {
+    document.getElementById('ttLoading').style.display = 'block';
+    document.getElementById('timeTravelResult').style.display = 'none';
+    document.getElementById('ttEmpty').style.display = 'none';
+  }
+
+  try {
+    const d = timeTravelAt(await loadCurve(), days);
+    if (parseInt(document.getElementById('timeSlider').value) !== days) return;
+
+    document.getElementById('ttLoading').style.display = 'none';
+    document.getElementById('ttEmpty').style.display = 'none';
+
+    if (!d.holdings || d.holdings.length === 0) {
+      document.getElementById('timeTravelResult').style.display = 'none';
+      document.getElementById('ttEmpty').style.display = 'block';
+      return;
+    }
+
+    const pos   = d.total_gain >= 0;
+    const color = pos ? 'var(--green)' : 'var(--red)';
+
+    document.getElementById('ttThen').textContent = `$${fmt(d.total_then)}`;
+    document.getElementById('ttNow').textContent  = `$${fmt(d.total_now)}`;
+    document.getElementById('ttDate').textContent = d.date;
+
+    const gainEl = document.getElementById('ttGain');
+    gainEl.textContent = `${pos?'+':''}$${fmt(d.total_gain)}`;
+    gainEl.style.color = color;
+
+    const pctEl = document.getElementById('ttPct');
+    pctEl.textContent = `${pos?'+':''}${d.total_gain_pct}%`;
+    pctEl.style.color = color;
+
+    // Per-stock rows with expandable story panels
+    document.getElementById('ttBreakdown').innerHTML = d.holdings.map(h => {
+      const hPos   = h.gain >= 0;
+      const hColor = hPos ? 'var(--green)' : 'var(--red)';
+      const arrow  = hPos ? '▲' : '▼';
+      return `
+        <div style="background:var(--bg3);border-radius:10px;border:1px solid var(--border);overflow:hidden">
+
+          <!-- Main stock row -->
+          <div style="display:flex;justify-content:space-between;align-items:center;padding:12px 16px;flex-wrap:wrap;gap:10px">
+            <div style="display:flex;align-items:center;gap:12px">
+              <span style="font-family:var(--font-mono);font-weight:700;font-size:15px;background:var(--bg4);padding:3px 8px;border-radius:5px">${h.ticker}</span>
+              <span style="font-size:12px;color:var(--text2)">${h.shares} shares</span>
+            </div>
+            <div style="display:flex;align-items:center;gap:20px;flex-wrap:wrap">
+              <div style="text-align:right">
+                <div style="font-size:10px;color:var(--text3);font-family:var(--font-mono);text-transform:uppercase;margin-bottom:2px">Then</div>
+                <div style="font-family:var(--font-mono);font-size:13px">$${fmt(h.price_then)}</div>
+              </div>
+              <div style="color:var(--text3);font-size:16px">→</div>
+              <div style="text-align:right">
+                <div style="font-size:10px;color:var(--text3);font-family:var(--font-mono);text-transform:uppercase;margin-bottom:2px">Now</div>
+                <div style="font-family:var(--font-mono);font-size:13px">$${fmt(h.price_now)}</div>
+              </div>
+              <div style="text-align:right;min-width:90px">
+                <div style="font-family:var(--font-mono);font-weight:700;font-size:15px;color:${hColor}">${hPos?'+':''}$${fmt(h.gain)}</div>
+                <div style="font-size:11px;color:${hColor}">${arrow} ${Math.abs(h.gain_pct)}%</div>
+              </div>
+              <button class="why-btn" id="why-btn-${h.ticker}" onclick="toggleStory('${h.ticker}', ${days})">
+                ▼ Why?
+              </button>
+            </div>
+          </div>
+
+          <!-- Expandable story panel -->
+          <div class="story-panel" id="story-${h.ticker}">
+            <div id="story-content-${h.ticker}">
+              <div style="display:flex;align-items:center;gap:8px;color:var(--text3);font-size:13px">
+                <div style="width:16px;height:16px;border:2px solid var(--border2);border-top-color:var(--accent);border-radius:50%;animation:spin 0.8s linear infinite;flex-shrink:0"></div>
+                Loading insights...
+              </div>
+            </div>
+          </div>
+
+        </div>`;
+    }).join('');
+
+    document.getElementById('timeTravelResult').style.display = 'block';
+
+  } catch(e) {
+    ttCurve = null;
+    document.getElementById('ttLoading').style.display = 'none';
+  }
+}
+
+// ── Stock Story (News + AI) ───────────────────────────────────────
+
+const storyCache = {};
+
+async function toggleStory(ticker, days) {
+  const panel   = document.getElementById(`story-${ticker}`);
+  const btn     = document.getElementById(`why-btn-${ticker}`);
+  const content = document.getElementById(`story-content-${ticker}`);
+
+  const isOpen = panel.style.display === 'block';
+  panel.style.display = isOpen ? 'none' : 'block';
+  btn.textContent     = isOpen ? '▼ Why?' : '▲ Hide';
+
+  // If closing or already cached, just swap content
+  if (isOpen) return;
+  if (storyCache[ticker]) {
+    content.innerHTML = storyCache[ticker];
+    return;
+  }
+
+  // Fetch from backend
+  try {
+    const res  = await fetch(`/stocks/api/stockstory/${ticker}/?days=${days}`);
+    const data = await res.json();
+    let html   = '';
+
+    // AI Summary
+    if (data.ai_summary) {
+      html += `
+        <div style="display:flex;gap:12px;margin-bottom:20px;padding:14px;background:var(--bg4);border-radius:8px;border:1px solid rgba(88,166,255,0.2)">
+          <div style="font-size:22px;flex-shrink:0">🤖</div>
+          <div>
+            <div style="font-size:11px;font-family:var(--font-mono);color:var(--accent);text-transform:uppercase;letter-spacing:1px;margin-bottom:8px">AI Analysis · Gemini</div>
+            <p style="color:var(--text);font-size:14px;line-height:1.75;margin:0">${data.ai_summary}</p>
+          </div>
+        </div>`;
+    }
+
+    // News headlines
+    if (data.headlines && data.headlines.length > 0) {
+      html += `
+        <div>
+          <div style="font-size:11px;font-family:var(--font-mono);color:var(--text3);text-transform:uppercase;letter-spacing:1px;margin-bottom:10px">📰 Recent News</div>
+          ${data.headlines.map(a => `
+            <a href="${a.link}" target="_blank" class="news-link">
+              <div style="color:var(--text);font-size:13px;line-height:1.5">${a.title}</div>
+              <div style="font-size:11px;color:var(--text3);white-space:nowrap;font-family:var(--font-mono);flex-shrink:0">${a.publisher} ↗</div>
+            </a>`).join('')}
+        </div>`;
+    }
+
+    if (!html) {
+      html = `<div style="color:var(--text3);font-size:13px;padding:8px 0">No insights available for this stock right now.</div>`;
+    }
+
+    storyCache[ticker] = html;
+    content.innerHTML  = html;
+
+  } catch(e) {
+    content.innerHTML = `<div style="color:var(--red);font-size:13px">Could not load insights. Check your connection.</div>`;
+  }
+}
@@ -0,0 +1,129 @@
+"""
+Cached, rate-limited Gemini explanations for api_stock_story.
+
+Summaries are stored in StorySummary, keyed on ticker, day window and a
+hash of the headlines they were written from. Within STORY_CACHE_TTL an
+entry is served as-is. After that it is still served (up to
+STORY_CACHE_MAX_STALE) while a background thread writes a fresh one.
+Every Gemini call has to take a token from a shared bucket first, so a
+burst of clicks can't run up cost or pile up slow requests.
+"""
+import hashlib
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from . import upstream
+from .models import StorySummary
+
+
+STORY_TTL = getattr(settings, 'STORY_CACHE_TTL', 6 * 60 * 60)
+STORY_MAX_STALE = getattr(settings, 'STORY_CACHE_MAX_STALE', 7 * 24 * 60 * 60)
+
+
+class TokenBucket:
+    """Allows ``rate`` calls per second on average, with bursts up to ``capacity``."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+_bucket = TokenBucket(
+    rate=getattr(settings, 'GEMINI_CALLS_PER_MINUTE', 30) / 60,
+    capacity=getattr(settings, 'GEMINI_BURST', 5),
+)
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def headlines_hash(headlines):
+    return hashlib.sha1('\n'.join(headlines).encode()).hexdigest()
+
+
+def _lookup(ticker, days, digest):
+    oldest = timezone.now() - timedelta(seconds=STORY_MAX_STALE)
+    return (StorySummary.objects
+            .filter(ticker=ticker, days=days, headlines_hash=digest, updated_at__gte=oldest)
+            .first())
+
+
+def _save(ticker, days, digest, summary):
+    StorySummary.objects.update_or_create(
+        ticker=ticker, days=days, headlines_hash=digest, defaults={'summary': summary},
+    )
+    # anything past STORY_MAX_STALE is never served again, so drop it here
+    prune()
+
+
+def prune():
+    """Delete summaries too old to be served. Returns how many were removed."""
+    oldest = timezone.now() - timedelta(seconds=STORY_MAX_STALE)
+    deleted, _ = StorySummary.objects.filter(updated_at__lt=oldest).delete()
+    return deleted
+
+
+def _generate(prompt):
+    """Ask Gemini, or return None if the bucket is empty."""
+    if not _bucket.try_acquire():
+        return None
+    return upstream.ask_gemini(prompt)
+
+
+def _refresh(key, prompt):
+    try:
+        summary = _generate(prompt)
+        if summary:
+            _save(*key, summary)
+    except Exception:
+        pass
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+        connection.close()
+
+
+def refresh_in_background(ticker, days, digest, prompt):
+    key = (ticker, days, digest)
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    threading.Thread(target=_refresh, args=(key, prompt), daemon=True).start()
+
+
+async def get_summary(ticker, days, headlines, prompt):
+    """
+    Cached summary for this ticker/window/headlines. Generates one inline
+    only when nothing usable is stored; returns None if Gemini is
+    unavailable or rate-limited.
+    """
+    ticker = ticker.upper()
+    digest = headlines_hash(headlines)
+    entry = await upstream.call(_lookup, ticker, days, digest, db=True)
+    if entry is not None:
+        if (timezone.now() - entry.updated_at).total_seconds() > STORY_TTL:
+            refresh_in_background(ticker, days, digest, prompt)
+        return entry.summary
+
+    summary = await upstream.call(_generate, prompt, timeout=upstream.GEMINI_TIMEOUT)
+    if summary:
+        await upstream.call(_save, ticker, days, digest, summary, db=True)
+    return summary
@@ -0,0 +1,114 @@
+"""
+Live simulated price feed for the stock page.
+
+One PriceFeed runs per ticker while anyone is watching it. It jitters a
+base price every TICK_INTERVAL seconds and pushes the tick to every
+subscriber's queue, and only refreshes the base price from upstream every
+BASE_REFRESH seconds. However many tabs are open on a symbol, the
+upstream cost is one cached lookup per refresh.
+
+Feeds live on the ASGI server's single event loop (see meridian/asgi.py);
+api_stream refuses to stream under WSGI, where each request would get a
+throwaway loop.
+"""
+import asyncio
+import random
+import time
+
+from asgiref.sync import sync_to_async
+
+from . import market_data
+
+
+TICK_INTERVAL = 3
+BASE_REFRESH = 60
+
+
+def _fetch_base_price(ticker):
+    hist = market_data.get_history(ticker, period='1d')
+    return round(float(hist['Close'].iloc[-1]), 2)
+
+
+class PriceFeed:
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+        self.subscribers = set()
+        self.base_price = None
+        self.base_fetched_at = 0
+        self.last_tick = None
+        self.task = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=1)
+        if self.last_tick is not None:
+            queue.put_nowait(self.last_tick)
+        self.subscribers.add(queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    async def _refresh_base(self):
+        if time.monotonic() - self.base_fetched_at < BASE_REFRESH and self.base_price:
+            return
+        try:
+            self.base_price = await sync_to_async(_fetch_base_price, thread_sensitive=False)(self.ticker)
+        except Exception as e:
+            if self.base_price is None:
+                self._publish({'ticker': self.ticker, 'error': str(e)})
+        self.base_fetched_at = time.monotonic()
+
+    def _tick(self):
+        # Random walk: ±0.5% per tick around the latest base price
+        change_pct = random.uniform(-0.005, 0.005)
+        simulated_price = round(self.base_price * (1 + change_pct), 2)
+        return {
+            'ticker': self.ticker,
+            'current_price': simulated_price,
+            'change': round(simulated_price - self.base_price, 2),
+            'change_pct': round(change_pct * 100, 3),
+        }
+
+    def _publish(self, tick):
+        self.last_tick = tick
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()  # slow client: drop the stale tick
+            queue.put_nowait(tick)
+
+    async def _run(self):
+        try:
+            while self.subscribers:
+                await self._refresh_base()
+                if self.base_price:
+                    self._publish(self._tick())
+                await asyncio.sleep(TICK_INTERVAL)
+        finally:
+            self.last_tick = None
+            if not self.subscribers:
+                _feeds.pop(self.ticker, None)
+
+
+_feeds = {}
+
+
+def get_feed(ticker):
+    ticker = ticker.upper()
+    feed = _feeds.get(ticker)
+    if feed is None:
+        feed = _feeds[ticker] = PriceFeed(ticker)
+    return feed
+
+
+async def subscribe(ticker):
+    """Async iterator of ticks for ``ticker`` until the client goes away."""
+    feed = get_feed(ticker)
+    queue = feed.subscribe()
+    try:
+        while True:
+            yield await queue.get()
+    finally:
+        feed.unsubscribe(queue)
@@ -0,0 +1,195 @@
+"""
+In-process symbol directory for the search box.
+
+The bundled listing (data/symbols.csv) plus COMPANY_NAME_MAP aliases are
+loaded once into a sorted array of search keys. A query is answered with
+a bisect prefix scan, topped up with edit-distance matches for typos, so
+ranking candidates never touches the network.
+"""
+import csv
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from pathlib import Path
+
+
+LISTING_FILE = Path(__file__).resolve().parent / 'data' / 'symbols.csv'
+
+# dict to map company name to their ticker for search bar
+COMPANY_NAME_MAP = {
+    'apple': 'AAPL',
+    'microsoft': 'MSFT',
+    'google': 'GOOGL',
+    'alphabet': 'GOOGL',
+    'amazon': 'AMZN',
+    'tesla': 'TSLA',
+    'nvidia': 'NVDA',
+    'meta': 'META',
+    'facebook': 'META',
+    'netflix': 'NFLX',
+    'spotify': 'SPOT',
+    'uber': 'UBER',
+    'lyft': 'LYFT',
+    'airbnb': 'ABNB',
+    'paypal': 'PYPL',
+    'visa': 'V',
+    'mastercard': 'MA',
+    'jpmorgan': 'JPM',
+    'jp morgan': 'JPM',
+    'goldman sachs': 'GS',
+    'bank of america': 'BAC',
+    'disney': 'DIS',
+    'walmart': 'WMT',
+    'target': 'TGT',
+    'nike': 'NKE',
+    'coca cola': 'KO',
+    'cocacola': 'KO',
+    'pepsi': 'PEP',
+    'pepsico': 'PEP',
+    'mcdonalds': 'MCD',
+    "mcdonald's": 'MCD',
+    'starbucks': 'SBUX',
+    'intel': 'INTC',
+    'amd': 'AMD',
+    'advanced micro devices': 'AMD',
+    'qualcomm': 'QCOM',
+    'salesforce': 'CRM',
+    'oracle': 'ORCL',
+    'adobe': 'ADBE',
+    'zoom': 'ZM',
+    'shopify': 'SHOP',
+    'twitter': 'TWTR',
+    'snapchat': 'SNAP',
+    'snap': 'SNAP',
+    'coinbase': 'COIN',
+    'robinhood': 'HOOD',
+    'palantir': 'PLTR',
+    'spy': 'SPY',
+    's&p 500': 'SPY',
+    'sp500': 'SPY',
+    'boeing': 'BA',
+    'ford': 'F',
+    'gm': 'GM',
+    'general motors': 'GM',
+    'exxon': 'XOM',
+    'chevron': 'CVX',
+    'johnson and johnson': 'JNJ',
+    'johnson & johnson': 'JNJ',
+    'pfizer': 'PFE',
+    'moderna': 'MRNA',
+    'at&t': 'T',
+    'att': 'T',
+    'verizon': 'VZ',
+    'comcast': 'CMCSA',
+    'berkshire': 'BRK-B',
+    'berkshire hathaway': 'BRK-B',
+}
+
+# kinds of search key, best first
+TICKER, ALIAS, NAME, WORD = range(4)
+FUZZY_PENALTY = 10
+
+STOPWORDS = {
+    'inc', 'corp', 'corporation', 'company', 'co', 'plc', 'ltd', 'the', 'and',
+    'holdings', 'group', 'incorporated', 'sa', 'class', 'trust', 'etf',
+}
+
+
+def normalize(text):
+    return ' '.join(re.sub(r"[^a-z0-9&\-]+", ' ', text.lower()).split())
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance, or limit + 1 as soon as it must exceed ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+class SymbolIndex:
+
+    def __init__(self, listing, aliases):
+        self.names = dict(listing)
+        entries = []
+        for ticker, name in listing:
+            entries.append((ticker.lower(), ticker, TICKER))
+            norm = normalize(name)
+            entries.append((norm, ticker, NAME))
+            for word in norm.split()[1:]:
+                if word not in STOPWORDS:
+                    entries.append((word, ticker, WORD))
+        for alias, ticker in aliases.items():
+            self.names.setdefault(ticker, alias.title())
+            entries.append((normalize(alias), ticker, ALIAS))
+        entries.sort()
+        self._keys = [e[0] for e in entries]
+        self._entries = entries
+        # fuzzy candidates bucketed by first character
+        self._by_initial = {}
+        for entry in entries:
+            self._by_initial.setdefault(entry[0][:1], []).append(entry)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _prefix(self, q, scores):
+        i = bisect_left(self._keys, q)
+        while i < len(self._keys) and self._keys[i].startswith(q):
+            key, ticker, kind = self._entries[i]
+            score = kind * 2 + (key != q)
+            scores[ticker] = min(scores.get(ticker, score), score)
+            i += 1
+
+    def _fuzzy(self, q, scores):
+        limit = 1 if len(q) <= 5 else 2
+        for key, ticker, kind in self._by_initial.get(q[:1], ()):
+            # compare against the key's prefix so partial words still match
+            d = edit_distance(q, key[:len(q)], limit)
+            if d <= limit:
+                score = FUZZY_PENALTY + d * 2 + kind
+                scores[ticker] = min(scores.get(ticker, score), score)
+
+    def search(self, query, limit=8):
+        """Ranked ``[(ticker, name), ...]`` for ``query``, best match first."""
+        return list(self._search(normalize(query), limit))
+
+    def _search(self, q, limit):
+        if not q:
+            return ()
+        scores = {}
+        self._prefix(q, scores)
+        if len(scores) < limit and len(q) >= 3:
+            self._fuzzy(q, scores)
+        ranked = sorted(scores, key=lambda t: (scores[t], len(t), t))[:limit]
+        return tuple((t, self.names[t]) for t in ranked)
+
+
+@lru_cache(maxsize=1)
+def get_index():
+    with open(LISTING_FILE, newline='') as f:
+        listing = [(row['symbol'], row['name']) for row in csv.DictReader(f)]
+    return SymbolIndex(listing, COMPANY_NAME_MAP)
+
+
+# keyed on the normalized query only, so it holds no reference to an index
+@lru_cache(maxsize=2048)
+def _cached_search(q, limit):
+    return get_index()._search(q, limit)
+
+
+def search(query, limit=8):
+    return list(_cached_search(normalize(query), limit))
+
+
+def reload():
+    """Re-read the listing on next use, dropping results ranked against the old one."""
+    get_index.cache_clear()
+    _cached_search.cache_clear()
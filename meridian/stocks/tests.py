@@ -1,3 +1,763 @@
-from django.test import TestCase
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.db import IntegrityError, connection
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+
+from leaderboard import services as leaderboard_services
+from leaderboard.models import Leaderboard
+from login.models import Profile
+from . import (candles, charts, history_store, market_data, perf, prewarm, quotes, replay,
+               resilience, story, symbols, trading, upstream, valuation)
+from .models import Holding, Position, PriceBar, StorySummary, Transaction, WatchlistItem
+
+
+class TTLCacheTests(TestCase):
+
+    def test_concurrent_misses_share_one_fetch(self):
+        cache = market_data.TTLCache()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'bars'
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: cache.get_or_fetch('k', 60, fetch), range(8)))
+        self.assertEqual(results, ['bars'] * 8)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.coalesced + cache.misses + cache.hits, 8)
+
+    def test_entries_expire_and_lru_is_evicted(self):
+        cache = market_data.TTLCache(max_entries=2)
+        cache.get_or_fetch('a', 0.05, lambda: 1)
+        self.assertEqual(cache.get_or_fetch('a', 0.05, lambda: 2), 1)
+        time.sleep(0.06)
+        self.assertEqual(cache.get_or_fetch('a', 60, lambda: 3), 3)
+
+        cache.get_or_fetch('b', 60, lambda: 'b')
+        cache.get_or_fetch('a', 60, lambda: 'unused')  # a is now most recent
+        cache.get_or_fetch('c', 60, lambda: 'c')
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.get_or_fetch('a', 60, lambda: 'unused'), 3)
+        self.assertEqual(cache.get_or_fetch('b', 60, lambda: 'refetched'), 'refetched')
+        self.assertEqual(cache.evictions, 2)
+
+    def test_interrupted_fetch_is_not_cached(self):
+        cache = market_data.TTLCache()
+
+        def interrupted():
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            cache.get_or_fetch('k', 60, interrupted)
+        self.assertEqual(cache.get_or_fetch('k', 60, lambda: 'ok'), 'ok')
+
+
+class HistoryStoreTests(TestCase):
+
+    def setUp(self):
+        history_store._series_cache.clear()
+
+    def _frame(self, days, closes):
+        return pd.DataFrame({'Open': closes, 'High': closes, 'Low': closes, 'Close': closes,
+                             'Volume': 100}, index=pd.to_datetime(days))
+
+    def test_backfill_then_sync_only_the_tail(self):
+        backfill = {'AAA': self._frame(['2024-01-02', '2024-01-03'], [10.0, 11.0])}
+        with mock.patch.object(market_data, 'download_bars', return_value=backfill) as download:
+            series = history_store.get_series('aaa')
+        download.assert_called_once_with(['AAA'], period=history_store.BACKFILL_PERIOD)
+        self.assertEqual(series.closes, [10.0, 11.0])
+
+        # the 3rd was still trading when it was stored: its close gets overwritten
+        tail = {'AAA': self._frame(['2024-01-03', '2024-01-04'], [11.5, 12.0])}
+        history_store._series_cache.clear()
+        with mock.patch.object(market_data, 'download_bars', return_value=tail) as download:
+            series = history_store.get_series('AAA')
+        download.assert_called_once_with(['AAA'], start='2024-01-03')
+        self.assertEqual(series.closes, [10.0, 11.5, 12.0])
+        self.assertEqual(PriceBar.objects.filter(ticker='AAA').count(), 3)
+
+    def test_stale_tickers_are_synced_from_their_own_last_bar(self):
+        for ticker, day in (('AAA', date(2024, 1, 3)), ('BBB', date(2024, 1, 3)),
+                            ('OLD', date(2020, 6, 1))):
+            PriceBar.objects.create(ticker=ticker, date=day, open=1, high=1, low=1, close=1)
+        with mock.patch.object(market_data, 'download_bars', return_value={}) as download:
+            history_store.sync(['AAA', 'OLD', 'BBB'])
+        self.assertEqual(sorted(c.kwargs['start'] for c in download.call_args_list),
+                         ['2020-06-01', '2024-01-03'])
+        self.assertIn(mock.call(['AAA', 'BBB'], start='2024-01-03'), download.call_args_list)
+
+    def test_series_lookups(self):
+        days = [date(2024, 1, 2), date(2024, 1, 5), date(2024, 3, 1), date(2024, 4, 1)]
+        series = history_store.BarSeries('X', days, [1.0, 2.0, 3.0, 4.0])
+        self.assertIsNone(series.close_on_or_before(date(2024, 1, 1)))
+        self.assertEqual(series.close_on_or_before(date(2024, 1, 5)), 2.0)
+        self.assertEqual(series.close_on_or_before(date(2024, 2, 20)), 2.0)
+        self.assertEqual(series.window('1mo'), (days[2:], [3.0, 4.0]))
+        self.assertEqual(series.window('ytd'), (days, [1.0, 2.0, 3.0, 4.0]))
+        self.assertEqual(series.window('1d'), (days[-1:], [4.0]))
+
+
+class ConcurrentTradeTests(TransactionTestCase):
+    """Fire many orders at once and check no cash or shares are lost."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('trader', password='pw')
+        Profile.objects.create(user=self.user, balance=100000.0)
+
+    def _run_parallel(self, fn, orders, workers=16):
+        def run(order):
+            try:
+                fn(self.user, *order)
+                return True
+            except trading.TradeError:
+                return False
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(run, orders))
+
+    def test_parallel_buys_conserve_balance(self):
+        results = self._run_parallel(trading.buy, [('AAPL', 1.0, 100.0)] * 300)
+
+        self.assertTrue(all(results))
+        profile = Profile.objects.get(user=self.user)
+        position = Position.objects.get(user=self.user, ticker='AAPL')
+        self.assertAlmostEqual(profile.balance, 100000.0 - 300 * 100.0)
+        self.assertAlmostEqual(position.shares, 300)
+        self.assertAlmostEqual(position.cost_basis, 300 * 100.0)
+        self.assertEqual(Holding.objects.filter(user=self.user).count(), 300)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 300)
+
+    def test_parallel_buys_never_overdraw(self):
+        Profile.objects.filter(user=self.user).update(balance=1000.0)
+
+        results = self._run_parallel(trading.buy, [('TSLA', 1.0, 100.0)] * 200)
+
+        self.assertEqual(sum(results), 10)
+        self.assertAlmostEqual(Profile.objects.get(user=self.user).balance, 0)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 10)
+
+    def test_parallel_sells_never_oversell(self):
+        trading.buy(self.user, 'NVDA', 50.0, 10.0)
+
+        results = self._run_parallel(trading.sell, [('NVDA', 1.0, 12.0)] * 200)
+
+        self.assertEqual(sum(results), 50)
+        profile = Profile.objects.get(user=self.user)
+        position = Position.objects.get(user=self.user, ticker='NVDA')
+        self.assertAlmostEqual(profile.balance, 100000.0 - 500.0 + 50 * 12.0)
+        self.assertAlmostEqual(position.shares, 0)
+        self.assertAlmostEqual(position.cost_basis, 0)
+
+    def test_rejects_non_positive_orders(self):
+        with self.assertRaises(trading.TradeError):
+            trading.buy(self.user, 'AAPL', -5.0, 100.0)
+        with self.assertRaises(trading.TradeError):
+            trading.sell(self.user, 'AAPL', 0.0, 100.0)
+
+
+    def test_only_lock_errors_are_retried(self):
+        calls = []
+
+        def violates_constraint():
+            calls.append(1)
+            raise IntegrityError('NOT NULL constraint failed')
+
+        with self.assertRaises(IntegrityError):
+            trading._with_retry(violates_constraint)
+        self.assertEqual(len(calls), 1)
+
+
+class LeaderboardMarkTests(TestCase):
+
+    def test_trade_scores_from_stored_closes(self):
+        user = User.objects.create_user('trader', password='pw')
+        Profile.objects.create(user=user, balance=1000.0)
+        PriceBar.objects.create(ticker='AAA', date=date(2024, 1, 2), open=1, high=1, low=1, close=40)
+        PriceBar.objects.create(ticker='AAA', date=date(2024, 1, 3), open=1, high=1, low=1, close=50)
+        trading.buy(user, 'AAA', 2, 45.0)
+        trading.buy(user, 'BBB', 1, 10.0)  # never priced: carried at cost
+        score = Leaderboard.objects.get(profile__user=user).score
+        self.assertEqual(float(score), 1000 - 90 - 10 + 2 * 50 + 10)
+
+    def test_cached_top_list_is_dropped_after_a_trade(self):
+        cache.clear()
+        user = User.objects.create_user('trader', password='pw')
+        profile = Profile.objects.create(user=user, balance=1000.0)
+        Leaderboard.objects.create(profile=profile, score=1000)
+        PriceBar.objects.create(ticker='AAA', date=date(2024, 1, 3), open=1, high=1, low=1, close=50)
+        self.assertEqual(float(leaderboard_services.top_entries()[0].score), 1000)
+
+        self.client.force_login(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/stocks/api/buy/', {'ticker': 'aaa', 'shares': 2, 'price': 45},
+                                        content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(1):
+            self.assertEqual(float(leaderboard_services.top_entries()[0].score), 1010)
+
+
+class TransactionsViewTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('trader', password='pw')
+        Profile.objects.create(user=self.user, balance=100000.0)
+        self.client.force_login(self.user)
+
+    def _trade(self, count):
+        for i in range(count):
+            trading.buy(self.user, 'AAPL', 2.0, 100.0 + i)
+            trading.sell(self.user, 'AAPL', 1.0, 90.0 + 3 * i)
+
+    def test_query_count_does_not_grow_with_ledger(self):
+        self._trade(5)
+        with self.assertNumQueries(5):
+            self.client.get('/stocks/history/')
+
+        self._trade(60)
+        with self.assertNumQueries(5):
+            response = self.client.get('/stocks/history/')
+        self.assertEqual(len(response.context['transactions']), 50)
+
+    def test_summary_and_best_worst_trade(self):
+        trading.buy(self.user, 'AAPL', 10.0, 100.0)
+        trading.buy(self.user, 'AAPL', 10.0, 200.0)
+        trading.sell(self.user, 'AAPL', 5.0, 180.0)   # avg cost 150 -> +150
+        trading.buy(self.user, 'TSLA', 4.0, 50.0)
+        trading.sell(self.user, 'TSLA', 4.0, 40.0)    # -40
+
+        ctx = self.client.get('/stocks/history/').context
+        self.assertEqual(ctx['total_spent'], 3200.0)
+        self.assertEqual(ctx['total_received'], 1060.0)
+        self.assertEqual(ctx['buy_count'], 3)
+        self.assertEqual(ctx['sell_count'], 2)
+        self.assertEqual(ctx['total_trades'], 5)
+        self.assertEqual(ctx['best_trade'][0].ticker, 'AAPL')
+        self.assertEqual(ctx['best_trade'][1], 150.0)
+        self.assertEqual(ctx['worst_trade'][0].ticker, 'TSLA')
+        self.assertEqual(ctx['worst_trade'][1], -40.0)
+
+
+class LedgerIndexTests(TestCase):
+    """The ledger queries behind transactions_view should never scan or sort the table."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('trader', password='pw')
+        other = User.objects.create_user('other', password='pw')
+        for user in (self.user, other):
+            Profile.objects.create(user=user, balance=100000.0)
+            for i in range(20):
+                trading.buy(user, 'AAPL', 2.0, 100.0 + i)
+                trading.sell(user, 'AAPL', 1.0, 90.0 + i)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.client.force_login(self.user)
+
+    def _plan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return ' | '.join(row[-1] for row in cursor.fetchall())
+
+    @skipUnlessDBFeature('supports_explaining_query_execution')
+    def test_transactions_view_queries_use_indexes(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('plan text is SQLite-specific')
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/stocks/history/')
+        plans = {q['sql']: self._plan(q['sql']) for q in ctx.captured_queries
+                 if 'FROM "stocks_transaction"' in q['sql']}
+        self.assertEqual(len(plans), 3)
+        for sql, plan in plans.items():
+            self.assertIn('USING', plan, sql)
+            self.assertNotIn('TEMP B-TREE', plan, sql)
+        summary = next(p for sql, p in plans.items() if 'SUM(' in sql)
+        self.assertIn('COVERING INDEX txn_user_action_total_idx', summary)
+
+    def test_money_is_stored_in_cents(self):
+        balance = Profile.objects.get(user=self.user).balance
+        trading.buy(self.user, 'TSLA', 3.0, 33.333)
+        txn = Transaction.objects.filter(user=self.user, ticker='TSLA').get()
+        self.assertEqual(txn.price, Decimal('33.33'))
+        self.assertEqual(txn.total, Decimal('99.99'))  # 3 x the stored price
+        self.assertAlmostEqual(Profile.objects.get(user=self.user).balance, balance - 99.99)
+        with self.assertRaises(trading.TradeError):
+            trading.buy(self.user, 'TSLA', 1.0, 0.004)  # rounds to nothing
+        response = self.client.get('/stocks/history/')
+        self.assertIsInstance(response.context['total_spent'], Decimal)
+
+
+class LedgerReplayTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('trader', password='pw')
+
+    def _txn(self, day, ticker, action, shares):
+        txn = Transaction.objects.create(user=self.user, ticker=ticker, action=action,
+                                         shares=shares, price=1.0, total=shares)
+        # created_at is auto_now_add, so backdate it afterwards
+        Transaction.objects.filter(pk=txn.pk).update(
+            created_at=datetime(*day, 15, tzinfo=timezone.utc))
+
+    def test_shares_on_reflects_trades_up_to_that_day(self):
+        self._txn((2024, 1, 2), 'AAPL', Transaction.BUY, 10)
+        self._txn((2024, 3, 1), 'TSLA', Transaction.BUY, 5)
+        self._txn((2024, 6, 3), 'AAPL', Transaction.SELL, 4)
+        ledger = replay.LedgerReplay(self.user.pk, checkpoint_days=30).extend()
+
+        self.assertEqual(ledger.shares_on(date(2023, 12, 31)), {})
+        self.assertEqual(ledger.shares_on(date(2024, 2, 1)), {'AAPL': 10})
+        self.assertEqual(ledger.shares_on(date(2024, 6, 3)), {'AAPL': 6, 'TSLA': 5})
+
+    def test_extend_only_reads_new_trades(self):
+        self._txn((2024, 1, 2), 'AAPL', Transaction.BUY, 10)
+        ledger = replay.LedgerReplay(self.user.pk).extend()
+        self._txn((2024, 2, 1), 'AAPL', Transaction.SELL, 10)
+        with self.assertNumQueries(1):
+            ledger.extend()
+        self.assertEqual(ledger.shares_on(date(2024, 2, 1)), {})
+        self.assertEqual(ledger.shares_on(date(2024, 1, 31)), {'AAPL': 10})
+
+    def test_checkpoints_match_full_replay(self):
+        for month in range(1, 13):
+            self._txn((2024, month, 1), 'AAPL', Transaction.BUY, month)
+        sparse = replay.LedgerReplay(self.user.pk, checkpoint_days=90).extend()
+        dense = replay.LedgerReplay(self.user.pk, checkpoint_days=0).extend()
+        for month in range(1, 13):
+            day = date(2024, month, 15)
+            self.assertEqual(sparse.shares_on(day), dense.shares_on(day))
+
+    def test_checkpoint_day_keeps_every_trade_of_that_day(self):
+        self._txn((2024, 1, 2), 'AAPL', Transaction.BUY, 10)
+        self._txn((2024, 1, 2), 'AAPL', Transaction.BUY, 5)
+        self._txn((2024, 3, 1), 'AAPL', Transaction.BUY, 1)
+        self._txn((2024, 3, 1), 'TSLA', Transaction.BUY, 2)
+        ledger = replay.LedgerReplay(self.user.pk, checkpoint_days=30).extend()
+        self.assertEqual(len(ledger.checkpoints), 2)
+        self.assertEqual(ledger.shares_on(date(2024, 1, 2)), {'AAPL': 15})
+        self.assertEqual(ledger.shares_on(date(2024, 3, 1)), {'AAPL': 16, 'TSLA': 2})
+        frame = ledger.share_frame(pd.DatetimeIndex(['2024-01-02', '2024-03-01']), ['AAPL', 'TSLA'])
+        self.assertEqual(frame.to_numpy().tolist(), [[15, 0], [16, 2]])
+
+    def test_ids_out_of_time_order_are_applied_once(self):
+        self._txn((2024, 1, 3), 'AAPL', Transaction.BUY, 1)
+        self._txn((2024, 1, 3), 'AAPL', Transaction.BUY, 10)
+        # the higher id was stamped first, as when two trades commit out of order
+        Transaction.objects.filter(shares=1).update(
+            created_at=datetime(2024, 1, 3, 16, tzinfo=timezone.utc))
+        ledger = replay.LedgerReplay(self.user.pk).extend()
+        self._txn((2024, 1, 4), 'AAPL', Transaction.BUY, 100)
+        ledger.extend()
+        self.assertEqual(ledger.holdings, {'AAPL': 111})
+        self.assertEqual(ledger.shares_on(date(2024, 1, 3)), {'AAPL': 11})
+
+    def test_backdated_trade_rebuilds_under_the_same_lock(self):
+        self._txn((2024, 3, 1), 'AAPL', Transaction.BUY, 10)
+        ledger = replay.LedgerReplay(self.user.pk).extend()
+        lock = ledger._lock
+        self._txn((2024, 1, 2), 'TSLA', Transaction.BUY, 5)
+        ledger.extend()
+        self.assertIs(ledger._lock, lock)
+        self.assertEqual(ledger.shares_on(date(2024, 2, 1)), {'TSLA': 5})
+        self.assertEqual(ledger.shares_on(date(2024, 3, 1)), {'AAPL': 10, 'TSLA': 5})
+
+
+class ValueCurveTests(TestCase):
+
+    def setUp(self):
+        history_store._series_cache.clear()
+        self.user = User.objects.create_user('trader', password='pw')
+        today = date.today()
+        self.days = [today - timedelta(days=5), today - timedelta(days=3)]
+        for day, close in zip(self.days, (10, 12)):
+            PriceBar.objects.create(ticker='AAA', date=day, open=1, high=1, low=1, close=close)
+        txn = Transaction.objects.create(user=self.user, ticker='AAA', action=Transaction.BUY,
+                                         shares=2, price=10, total=20)
+        Transaction.objects.filter(pk=txn.pk).update(
+            created_at=datetime.combine(self.days[0], datetime.min.time(), timezone.utc))
+
+    def test_curve_values_held_shares_each_day(self):
+        with mock.patch.object(market_data, 'download_bars', return_value={}):
+            curve = valuation.value_curve(replay.LedgerReplay(self.user.pk).extend(), days=30)
+        self.assertEqual(curve['dates'], [d.isoformat() for d in self.days])
+        self.assertEqual(curve['total'], [20.0, 24.0])
+        self.assertEqual(curve['shares'], {'AAA': [2.0, 2.0]})
+
+    def test_view_caps_days_at_the_stored_history(self):
+        self.client.force_login(self.user)
+        url = '/stocks/api/timetravel/curve/'
+        self.assertEqual(self.client.get(url, {'days': 'a year'}).status_code, 400)
+        with mock.patch.object(market_data, 'download_bars', return_value={}):
+            data = self.client.get(url, {'days': 10 * 365}).json()
+            self.assertEqual((data['days'], data['truncated']), (valuation.MAX_DAYS, True))
+            self.assertFalse(self.client.get(url, {'days': 30}).json()['truncated'])
+
+
+class SymbolSearchTests(TestCase):
+
+    def test_reload_drops_cached_results(self):
+        self.assertEqual(symbols.search('aapl')[0][0], 'AAPL')
+        old = symbols.get_index()
+        symbols.reload()
+        self.assertEqual(symbols._cached_search.cache_info().currsize, 0)
+        self.assertEqual(symbols.search('apple')[0][0], 'AAPL')
+        self.assertIsNot(symbols.get_index(), old)
+
+
+class StorySummaryTests(TestCase):
+
+    def test_saving_prunes_expired_summaries(self):
+        story._save('OLD', 7, 'a' * 40, 'old news')
+        stale = datetime.now(timezone.utc) - timedelta(seconds=story.STORY_MAX_STALE + 60)
+        StorySummary.objects.filter(ticker='OLD').update(updated_at=stale)
+        story._save('NEW', 7, 'b' * 40, 'fresh news')
+        self.assertEqual(list(StorySummary.objects.values_list('ticker', flat=True)), ['NEW'])
+
+
+class PriceStreamTests(TestCase):
+
+    def test_wsgi_requests_get_no_stream(self):
+        self.client.force_login(User.objects.create_user('trader', password='pw'))
+        response = self.client.get('/stocks/api/stream/AAPL/')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(response.streaming)
+
+
+class PerformanceMiddlewareTests(TestCase):
+
+    def setUp(self):
+        perf.clear()
+        self.user = User.objects.create_user('trader', password='pw')
+        Profile.objects.create(user=self.user, balance=100000.0)
+        self.client.force_login(self.user)
+
+    def test_server_timing_counts_queries(self):
+        response = self.client.get('/stocks/api/user/')
+        timing = response['Server-Timing']
+        self.assertTrue(timing.startswith('total;dur='))
+        self.assertIn('db;dur=', timing)
+        self.assertIn('queries"', timing)
+
+    def test_stats_are_staff_only_and_grouped_by_url_name(self):
+        for _ in range(3):
+            self.client.get('/stocks/api/user/')
+        self.assertEqual(self.client.get('/stocks/api/perf/stats/').status_code, 302)
+
+        self.user.is_staff = True
+        self.user.save()
+        views = self.client.get('/stocks/api/perf/stats/').json()['views']
+        self.assertEqual(views['api_user']['count'], 3)
+        self.assertGreater(views['api_user']['calls']['db']['count'], 0)
+
+
+class StaticFilesMiddlewareTests(TestCase):
+
+    @override_settings(DEBUG=True)
+    def test_asgi_stack_stays_async(self):
+        handler = ASGIHandler()
+        # Django logs this at DEBUG for each sync-only middleware it has to adapt
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            handler.load_middleware(is_async=True)
+
+    @override_settings(WHITENOISE_USE_FINDERS=True, WHITENOISE_AUTOREFRESH=True)
+    async def test_static_files_are_served_under_asgi(self):
+        response = await self.async_client.get('/static/portfolio.js')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'ttCurve', b''.join([chunk async for chunk in response]))
+
+
+class QuotesTests(TestCase):
+
+    def setUp(self):
+        market_data.clear()
+        self.user = User.objects.create_user('trader', password='pw')
+        self.client.force_login(self.user)
+
+    def _bars(self, tickers, period=None, start=None):
+        index = pd.to_datetime(['2024-01-02', '2024-01-03'])
+        return {t: pd.DataFrame({'Close': [100.0, 110.0]}, index=index)
+                for t in tickers if t != 'NOPE'}
+
+    def test_many_tickers_cost_one_upstream_call(self):
+        with mock.patch.object(market_data, 'download_bars', side_effect=self._bars) as download:
+            data = self.client.get('/stocks/api/quotes/?tickers=aapl,TSLA,NOPE,aapl').json()
+        self.assertEqual(download.call_count, 1)
+        self.assertEqual([q['ticker'] for q in data['quotes']], ['AAPL', 'TSLA'])
+        self.assertEqual(data['quotes'][0]['name'], 'Apple Inc.')
+        self.assertEqual(data['quotes'][0]['change_pct'], 10.0)
+
+    def test_watchlist_replaces_the_default_list(self):
+        with mock.patch.object(market_data, 'download_bars', side_effect=self._bars):
+            data = self.client.get('/stocks/api/quotes/').json()
+            self.assertFalse(data['watchlist'])
+            self.assertEqual(len(data['quotes']), 8)
+
+            self.client.post('/stocks/api/watchlist/add/', {'ticker': 'nvda'}, content_type='application/json')
+            self.client.post('/stocks/api/watchlist/add/', {'ticker': 'NVDA'}, content_type='application/json')
+            data = self.client.get('/stocks/api/quotes/').json()
+        self.assertTrue(data['watchlist'])
+        self.assertEqual([q['ticker'] for q in data['quotes']], ['NVDA'])
+
+        self.client.post('/stocks/api/watchlist/remove/', {'ticker': 'NVDA'}, content_type='application/json')
+        self.assertFalse(WatchlistItem.objects.filter(user=self.user).exists())
+
+
+class ChartPayloadTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('trader', password='pw')
+        self.client.force_login(self.user)
+        days = np.arange('2020-01-01', '2024-01-01', dtype='datetime64[D]')
+        self.dates = np.datetime_as_string(days, unit='D')
+        self.closes = np.round(100 + 10 * np.sin(np.arange(len(days)) / 50), 2)
+
+    def test_lttb_keeps_endpoints_and_extremes(self):
+        keep = charts.lttb(self.closes, 200)
+        self.assertEqual(len(keep), 200)
+        self.assertEqual((keep[0], keep[-1]), (0, len(self.closes) - 1))
+        self.assertTrue(np.all(np.diff(keep) > 0))
+        self.assertAlmostEqual(self.closes[keep].max(), self.closes.max(), delta=0.05)
+        self.assertAlmostEqual(self.closes[keep].min(), self.closes.min(), delta=0.05)
+        self.assertEqual(len(charts.lttb(self.closes[:10], 200)), 10)
+
+    def test_columnar_chart_only_skips_company_info(self):
+        with mock.patch.object(charts, 'close_history', return_value=(self.dates, self.closes)), \
+                mock.patch.object(market_data, 'get_info') as get_info:
+            data = self.client.get('/stocks/api/stock/aapl/', {
+                'period': '5y', 'fields': 'current_price,history', 'format': 'columns', 'points': 300,
+            }).json()
+        get_info.assert_not_called()
+        self.assertEqual(set(data), {'ticker', 'current_price', 'history'})
+        self.assertEqual(len(data['history']['dates']), 300)
+        self.assertEqual(data['history']['dates'][-1], '2023-12-31')
+        self.assertEqual(data['current_price'], self.closes[-1])
+
+    def test_bad_points_is_a_client_error(self):
+        for points in ('abc', '-5', '1.5'):
+            response = self.client.get('/stocks/api/stock/aapl/', {'points': points})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('points', response.json()['error'])
+
+
+class CandlePyramidTests(TestCase):
+
+    def setUp(self):
+        days = pd.bdate_range('2024-01-01', '2024-03-29')
+        close = np.arange(len(days), dtype=float) + 100
+        self.daily = pd.DataFrame({'Open': close - 0.5, 'High': close + 1, 'Low': close - 1,
+                                   'Close': close, 'Volume': 10}, index=days)
+        session = pd.date_range('2024-03-28 09:30', periods=52, freq='15min')
+        session = session[session.time < pd.Timestamp('16:00').time()]
+        self.intraday = pd.DataFrame({'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5,
+                                      'Volume': 1}, index=session)
+
+    def test_levels_aggregate_the_base_bars(self):
+        levels = candles.build(self.intraday, self.daily)
+        weekly, monthly, hourly = levels['1w'], levels['1mo'], levels['1h']
+        self.assertEqual(weekly.index[0], pd.Timestamp('2024-01-01'))
+        self.assertEqual(weekly.iloc[0].tolist(), [99.5, 105, 99, 104, 50])
+        self.assertEqual(list(monthly.index.month), [1, 2, 3])
+        self.assertEqual(monthly['Volume'].sum(), self.daily['Volume'].sum())
+        self.assertEqual(hourly.index[0], pd.Timestamp('2024-03-28 09:30'))
+        self.assertEqual(len(hourly), 7)
+        self.assertEqual(hourly['Volume'].tolist(), [4] * 6 + [2])
+
+    def test_range_queries_pick_the_finest_level_that_fits(self):
+        with mock.patch.object(candles, 'get_pyramid', return_value=candles.build(self.intraday, self.daily)):
+            self.assertEqual(candles.get_candles('X', start='2024-03-28')[0], '1h')
+            resolution, frame = candles.get_candles('X', start='2024-01-01', max_points=20)
+            self.assertEqual((resolution, len(frame)), ('1w', 13))
+            resolution, frame = candles.get_candles('X', '1d', start='2024-02-01', end='2024-02-29')
+        self.assertEqual((resolution, len(frame)), ('1d', 21))
+        self.assertEqual(frame.index[-1], pd.Timestamp('2024-02-29'))
+
+    def test_daily_levels_survive_an_upstream_outage(self):
+        candles.clear()
+        down = resilience.CircuitOpen('down')
+        with mock.patch.object(market_data, 'get_intraday', side_effect=down) as intraday, \
+                mock.patch.object(candles.history_store, 'get_frame', return_value=self.daily):
+            self.assertEqual(len(candles.get_candles('X', '1w')[1]), 13)
+            intraday.assert_not_called()
+            # auto resolution would try hourly for a recent start; it falls back instead
+            start = (date.today() - timedelta(days=3)).isoformat()
+            self.assertEqual(candles.get_candles('X', start=start)[0], '1d')
+            with self.assertRaises(resilience.CircuitOpen):
+                candles.get_candles('X', '1h')
+
+    def test_view_rejects_bad_dates_and_points(self):
+        candles.clear()
+        self.client.force_login(User.objects.create_user('trader', password='pw'))
+        url = '/stocks/api/candles/X/'
+        with mock.patch.object(market_data, 'get_intraday', return_value=self.intraday), \
+                mock.patch.object(candles.history_store, 'get_frame', return_value=self.daily):
+            for params in ({'start': 'last week'}, {'end': '2024-02-30'}, {'points': '0'}):
+                self.assertEqual(self.client.get(url, params).status_code, 400)
+            data = self.client.get(url, {'resolution': '1d', 'start': '2024-03-25'}).json()
+        self.assertEqual(data['time'], ['2024-03-25', '2024-03-26', '2024-03-27',
+                                        '2024-03-28', '2024-03-29'])
+
+
+class PrewarmTests(TestCase):
+
+    def test_schedule_follows_market_hours(self):
+        session = datetime(2026, 10, 14, 11, 0, tzinfo=prewarm.MARKET_TZ)
+        self.assertLessEqual(prewarm.next_delay(session), prewarm.INTERVAL * (1 + prewarm.JITTER))
+        # Friday after the close: idle cadence, well before Monday's open
+        friday = datetime(2026, 10, 16, 17, 0, tzinfo=prewarm.MARKET_TZ)
+        self.assertGreater(prewarm.next_delay(friday), prewarm.INTERVAL * 2)
+        # ten minutes before the open: wake up for the bell, not after it
+        early = datetime(2026, 10, 19, 9, 20, tzinfo=prewarm.MARKET_TZ)
+        self.assertLessEqual(prewarm.next_delay(early), 600 + prewarm.INTERVAL)
+        self.assertEqual(prewarm.seconds_until_open(friday), (2 * 24 + 16.5) * 3600)
+
+    def test_pass_warms_held_and_default_tickers(self):
+        market_data.clear()
+        user = User.objects.create_user('trader', password='pw')
+        Profile.objects.create(user=user)
+        Position.objects.create(user=user, ticker='ZZZ', shares=2, cost_basis=20)
+
+        def bars(tickers, period=None, start=None):
+            index = pd.to_datetime(['2024-01-02', '2024-01-03'])
+            return {t: pd.DataFrame({'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': [10.0, 11.0],
+                                     'Volume': 0}, index=index) for t in tickers}
+
+        with mock.patch.object(market_data, 'download_bars', side_effect=bars) as download:
+            names = prewarm.run_once(ttl=60)
+            calls = download.call_count
+            self.client.force_login(user)
+            data = self.client.get('/stocks/api/portfolio/').json()
+            self.client.get('/stocks/api/quotes/')
+        self.assertIn('ZZZ', names)
+        self.assertTrue(set(quotes.DEFAULT_WATCHLIST) <= set(names))
+        self.assertEqual(download.call_count, calls)
+        self.assertEqual(data['holdings'][0]['current_price'], 11.0)
+
+
+class ResilienceTests(TestCase):
+
+    def setUp(self):
+        resilience.reset()
+        market_data.clear()
+
+    def test_breaker_opens_and_lets_one_trial_through(self):
+        calls = []
+
+        def broken():
+            calls.append(1)
+            raise ConnectionError('down')
+
+        for _ in range(resilience.BREAKER_FAILURES):
+            with self.assertRaises(ConnectionError):
+                resilience.call('example.test', broken)
+        with self.assertRaises(resilience.CircuitOpen):
+            resilience.call('example.test', broken)
+        self.assertEqual(len(calls), resilience.BREAKER_FAILURES)
+
+        resilience.breaker('example.test').opened_at -= resilience.BREAKER_RESET
+        self.assertEqual(resilience.call('example.test', lambda: 'ok'), 'ok')
+        self.assertEqual(resilience.breaker('example.test').state, 'closed')
+
+    def test_slow_attempt_is_hedged_and_deadline_enforced(self):
+        attempts = []
+
+        def first_one_hangs():
+            attempts.append(1)
+            if len(attempts) == 1:
+                time.sleep(0.5)
+            return len(attempts)
+
+        started = time.monotonic()
+        self.assertEqual(resilience.call('example.test', first_one_hangs, hedge_after=0.05), 2)
+        self.assertLess(time.monotonic() - started, 0.4)
+        with self.assertRaises(resilience.DeadlineExceeded):
+            resilience.call('example.test', time.sleep, 0.5, deadline=0.05)
+
+    def test_only_transient_failures_are_hedged(self):
+        class Response:
+            def __init__(self, status_code):
+                self.status_code = status_code
+
+        def failing(status, attempts):
+            def fn():
+                attempts.append(1)
+                error = OSError(f'HTTP {status}')
+                error.response = Response(status)
+                raise error
+            return fn
+
+        for status, tries in ((503, 2), (429, 2), (404, 1)):
+            attempts = []
+            with self.assertRaises(OSError):
+                resilience.call(f'{status}.test', failing(status, attempts), hedge_after=0.05)
+            self.assertEqual(len(attempts), tries)
+        attempts = []
+        with self.assertRaises(KeyError):
+            resilience.call('parse.test', lambda: attempts.append(1) or {}['candidates'],
+                            hedge_after=0.05)
+        self.assertEqual(len(attempts), 1)
+
+    def test_only_transient_failures_open_the_breaker(self):
+        def unknown_symbol():
+            raise KeyError('regularMarketPrice')
+
+        class RateLimited(Exception):
+            pass
+
+        def rate_limited():
+            raise RateLimited
+
+        for _ in range(resilience.BREAKER_FAILURES * 2):
+            with self.assertRaises(KeyError):
+                resilience.call('example.test', unknown_symbol)
+        self.assertEqual(resilience.breaker('example.test').stats()['state'], 'closed')
+
+        for _ in range(resilience.BREAKER_FAILURES):
+            with self.assertRaises(RateLimited):
+                resilience.call('example.test', rate_limited, transient=(RateLimited,))
+        self.assertEqual(resilience.breaker('example.test').stats()['state'], 'open')
+
+    def test_async_call_reports_its_deadline(self):
+        with self.assertRaisesMessage(resilience.DeadlineExceeded, 'sleep did not finish within 0.05s'):
+            asyncio.run(upstream.call(time.sleep, 0.3, timeout=0.05))
+
+        def socket_timeout():
+            raise TimeoutError('read timed out')
+
+        with self.assertRaisesMessage(TimeoutError, 'read timed out'):
+            asyncio.run(upstream.call(socket_timeout))
+
+    def test_portfolio_falls_back_to_last_known_prices(self):
+        user = User.objects.create_user('trader', password='pw')
+        Profile.objects.create(user=user)
+        Position.objects.create(user=user, ticker='AAA', shares=2, cost_basis=20)
+        Position.objects.create(user=user, ticker='BBB', shares=1, cost_basis=50)
+        Position.objects.create(user=user, ticker='CCC', shares=1, cost_basis=30)
+        PriceBar.objects.create(ticker='BBB', date=date(2024, 1, 2), open=1, high=1, low=1, close=45)
+        # AAA was priced before upstream went down; that entry has expired
+        market_data._cache.put(('close', 'AAA', '2d'), -1, pd.Series([10.0, 12.0]))
+        self.client.force_login(user)
+
+        with mock.patch.object(market_data, 'download_bars', side_effect=resilience.CircuitOpen('down')):
+            data = self.client.get('/stocks/api/portfolio/').json()
+        holdings = {h['ticker']: h for h in data['holdings']}
+        self.assertTrue(data['stale'])
+        self.assertEqual(holdings['AAA']['current_price'], 12.0)
+        self.assertEqual(holdings['BBB']['current_price'], 45.0)
+        # nothing known at all: held at cost, not shown as a total loss
+        self.assertIsNone(holdings['CCC']['current_price'])
+        self.assertEqual(holdings['CCC']['gain_loss'], 0)
+        self.assertTrue(all(h['stale'] for h in holdings.values()))
@@ -0,0 +1,114 @@
+"""
+Trade execution for api_buy / api_sell.
+
+The balance check and debit are one conditional UPDATE, so two concurrent
+orders can never both spend the same cash. The cash move, position update,
+Holding/Transaction rows and leaderboard score commit in one transaction,
+which is retried a few times if the database reports a lock timeout.
+"""
+import random
+import time
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import F
+
+from leaderboard import services as leaderboard
+from login.models import Profile
+from .models import Holding, Position, Transaction
+
+
+MAX_ATTEMPTS = 20
+BACKOFF = 0.01  # seconds, doubled on each retry up to BACKOFF_MAX
+BACKOFF_MAX = 0.25
+
+
+class TradeError(Exception):
+    """The order was rejected; the message is safe to show the user."""
+
+
+class _PositionRace(Exception):
+    """Another order created the same Position first; the trade is retried."""
+
+
+def _is_lock_error(e):
+    msg = str(e).lower()
+    return any(s in msg for s in ('locked', 'deadlock', 'could not obtain lock',
+                                  'could not serialize'))
+
+
+def _with_retry(fn):
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            return fn()
+        except (OperationalError, _PositionRace) as e:
+            retryable = isinstance(e, _PositionRace) or _is_lock_error(e)
+            if not retryable or attempt == MAX_ATTEMPTS - 1:
+                raise
+            time.sleep(min(BACKOFF * 2 ** attempt, BACKOFF_MAX) * random.uniform(0.5, 1.5))
+
+
+def _validate(shares, price):
+    if not shares > 0 or not price > 0:
+        raise TradeError('Shares and price must be positive')
+
+
+def _cents(price):
+    """``price`` rounded to the cent, as Transaction.price stores it."""
+    return float(Decimal(str(price)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+
+
+def buy(user, ticker, shares, price):
+    price = _cents(price)
+    _validate(shares, price)
+    # from the stored price, so total == shares * price on every ledger row
+    total = round(shares * price, 2)
+
+    def execute():
+        with transaction.atomic():
+            debited = (Profile.objects
+                       .filter(user=user, balance__gte=total)
+                       .update(balance=F('balance') - total))
+            if not debited:
+                raise TradeError('Insufficient funds')
+            updated = (Position.objects
+                       .filter(user=user, ticker=ticker)
+                       .update(shares=F('shares') + shares,
+                               cost_basis=F('cost_basis') + total))
+            if not updated:
+                try:
+                    with transaction.atomic():
+                        Position.objects.create(user=user, ticker=ticker, shares=shares,
+                                                cost_basis=total)
+                except IntegrityError:
+                    raise _PositionRace from None
+            Holding.objects.create(user=user, ticker=ticker, shares=shares, buy_price=price)
+            leaderboard.update_score(user.pk)
+            return Transaction.objects.create(user=user, ticker=ticker, action=Transaction.BUY,
+                                              shares=shares, price=price, total=total)
+
+    return _with_retry(execute)
+
+
+def sell(user, ticker, shares, price):
+    price = _cents(price)
+    _validate(shares, price)
+    # from the stored price, so total == shares * price on every ledger row
+    total = round(shares * price, 2)
+
+    def execute():
+        with transaction.atomic():
+            # average-cost: the remaining shares keep their per-share cost
+            removed = (Position.objects
+                       .filter(user=user, ticker=ticker, shares__gte=shares)
+                       .update(cost_basis=F('cost_basis') * (F('shares') - shares) / F('shares'),
+                               shares=F('shares') - shares))
+            if not removed:
+                raise TradeError('Not enough shares')
+            Profile.objects.filter(user=user).update(balance=F('balance') + total)
+            Holding.objects.create(user=user, ticker=ticker, shares=-shares, buy_price=price)
+            leaderboard.update_score(user.pk)
+            return Transaction.objects.create(user=user, ticker=ticker, action=Transaction.SELL,
+                                              shares=shares, price=price, total=total)
+
+    return _with_retry(execute)
@@ -0,0 +1,90 @@
+"""
+Outbound HTTP for the stocks views (Yahoo news search, Gemini).
+
+All calls share one pooled requests.Session so connections are kept alive
+between requests. ``call`` runs any blocking upstream function off the
+event loop with its own timeout, so async views can await several of them
+concurrently. News and Gemini requests also go through their host's
+circuit breaker (stocks/resilience.py).
+"""
+import asyncio
+from urllib.parse import urlsplit
+
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from . import perf, resilience
+from .market_data import TTLCache
+
+
+NEWS_TIMEOUT = 5
+GEMINI_TIMEOUT = 10
+MARKET_DATA_TIMEOUT = 8
+NEWS_TTL = 10 * 60
+
+NEWS_URL = 'https://query2.finance.yahoo.com/v1/finance/search'
+GEMINI_URL = 'https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent'
+
+session = requests.Session()
+session.headers['User-Agent'] = 'Mozilla/5.0'
+session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=32))
+
+_news_cache = TTLCache(max_entries=256)
+
+
+async def call(fn, *args, timeout=None, db=False, **kwargs):
+    """
+    Await blocking ``fn(*args, **kwargs)`` with a deadline. Pass ``db=True``
+    when it touches the ORM so it runs on Django's sync thread; pure network
+    calls go to the shared thread pool and can overlap each other.
+
+    ORM calls may backfill the bar store with a bulk download, so they get
+    at least the bulk deadline by default: the thread can't be cancelled,
+    and giving up earlier would only leave it writing with nobody waiting.
+    """
+    if timeout is None:
+        timeout = max(MARKET_DATA_TIMEOUT, resilience.BULK_DEADLINE) if db else MARKET_DATA_TIMEOUT
+    task = asyncio.ensure_future(sync_to_async(fn, thread_sensitive=db)(*args, **kwargs))
+    # not wait_for: fn's own TimeoutError (e.g. a socket timeout) should pass through as-is
+    done, _ = await asyncio.wait({task}, timeout=timeout)
+    if not done:
+        task.cancel()
+        name = getattr(fn, '__name__', 'upstream call')
+        raise resilience.DeadlineExceeded(f'{name} did not finish within {timeout:g}s')
+    return task.result()
+
+
+def _search_news(ticker, count):
+    # status and body are checked inside the guarded call, so a 429/5xx or
+    # a garbled response counts against the breaker instead of as a success
+    def fetch():
+        res = session.get(NEWS_URL, params={'q': ticker, 'quotesCount': 0, 'newsCount': count},
+                          timeout=NEWS_TIMEOUT)
+        res.raise_for_status()
+        return [a for a in res.json().get('news', []) if a.get('title')][:count]
+
+    with perf.timed('news'):
+        return resilience.call(urlsplit(NEWS_URL).netloc, fetch,
+                               deadline=NEWS_TIMEOUT, hedge_after=resilience.HEDGE_AFTER)
+
+
+def fetch_news(ticker, count=5):
+    """Latest headlines for ``ticker``; shared by everyone for NEWS_TTL seconds."""
+    ticker = ticker.upper()
+    return list(_news_cache.get_or_fetch(
+        (ticker, count), NEWS_TTL, lambda: _search_news(ticker, count)))
+
+
+def ask_gemini(prompt):
+    def generate():
+        res = session.post(GEMINI_URL, params={'key': settings.GEMINI_API_KEY},
+                           json={'contents': [{'parts': [{'text': prompt}]}]},
+                           timeout=GEMINI_TIMEOUT)
+        res.raise_for_status()
+        return res.json()['candidates'][0]['content']['parts'][0]['text']
+
+    with perf.timed('gemini'):
+        # not hedged: every attempt is billed and rate limited
+        return resilience.call(urlsplit(GEMINI_URL).netloc, generate, deadline=GEMINI_TIMEOUT)
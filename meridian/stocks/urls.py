@@ -9,14 +9,23 @@ urlpatterns = [
 
     # API
     path('api/stock/<str:ticker>/', views.api_stock, name='api_stock'),
+    path('api/candles/<str:ticker>/', views.api_candles, name='api_candles'),
     path('api/search/<str:query>/', views.api_search, name='api_search'),
+    path('api/quotes/', views.api_quotes, name='api_quotes'),
+    path('api/watchlist/', views.api_watchlist, name='api_watchlist'),
+    path('api/watchlist/add/', views.api_watchlist_add, name='api_watchlist_add'),
+    path('api/watchlist/remove/', views.api_watchlist_remove, name='api_watchlist_remove'),
     path('api/portfolio/', views.api_portfolio, name='api_portfolio'),
     path('api/buy/', views.api_buy, name='api_buy'),
     path('api/sell/', views.api_sell, name='api_sell'),
     path('api/user/', views.api_user, name='api_user'),
     path('api/simulate/<str:ticker>/', views.api_simulate, name='api_simulate'),
+    path('api/stream/<str:ticker>/', views.api_stream, name='api_stream'),
     path('api/timetravel/', views.api_timetravel, name='api_timetravel'),
+    path('api/timetravel/curve/', views.api_timetravel_curve, name='api_timetravel_curve'),
     path('api/stockstory/<str:ticker>/', views.api_stock_story, name='api_stock_story'),
+    path('api/marketdata/stats/', views.api_market_data_stats, name='api_market_data_stats'),
+    path('api/perf/stats/', views.api_perf_stats, name='api_perf_stats'),
 
     
 ]
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""
+Vectorized portfolio valuation over time.
+
+All of a user's tickers are aligned onto one trading-day index from the
+local bar store and multiplied element-wise by the shares the ledger
+replay says were held on each day, so the whole value-over-time curve
+comes back from one call.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from . import history_store
+from .backends import PERIOD_DAYS
+
+
+# the store holds no bars older than its backfill, so curves can't reach further
+MAX_DAYS = PERIOD_DAYS.get(history_store.BACKFILL_PERIOD, 5 * 365)
+
+
+def price_frame(tickers, start=None):
+    """Closes as a (trading days x tickers) frame, forward-filled across gaps."""
+    series = history_store.get_many(tickers)
+    frame = pd.DataFrame({
+        t: pd.Series(s.closes, index=pd.DatetimeIndex(s.dates))
+        for t, s in series.items() if len(s)
+    })
+    if frame.empty:
+        return frame
+    frame = frame.sort_index().ffill()
+    if start is not None:
+        # keep the last bar before ``start`` so the first day has a price
+        first = frame.index.searchsorted(pd.Timestamp(start), side='right') - 1
+        frame = frame.iloc[max(first, 0):]
+    return frame
+
+
+def value_curve(ledger, days=365):
+    """
+    Daily portfolio value over the last ``days`` calendar days, using the
+    shares a LedgerReplay says were held on each day. Tickers with no price
+    yet on a given day contribute nothing to it. ``stale`` lists tickers
+    whose stored bars could not be synced and may end early.
+    """
+    start = date.today() - timedelta(days=days)
+    prices = price_frame(ledger.tickers, start=start)
+    # served from the cache price_frame just filled
+    stale = sorted(t for t, s in history_store.get_many(ledger.tickers).items() if s.stale)
+    if prices.empty:
+        return {'dates': [], 'total': [], 'tickers': [], 'shares': {}, 'prices': {}, 'stale': stale}
+
+    tickers = list(prices.columns)
+    held = ledger.share_frame(prices.index, tickers).to_numpy()
+    matrix = prices.to_numpy()
+    totals = (np.nan_to_num(matrix) * held).sum(axis=1)
+
+    rounded = np.round(matrix, 2)
+    held = np.round(held, 6)
+    return {
+        'dates': prices.index.strftime('%Y-%m-%d').tolist(),
+        'total': np.round(totals, 2).tolist(),
+        'tickers': tickers,
+        'shares': {t: held[:, i].tolist() for i, t in enumerate(tickers)},
+        # NaN (no bar yet) becomes null in the JSON
+        'prices': {t: [None if np.isnan(v) else v for v in rounded[:, i].tolist()]
+                   for i, t in enumerate(tickers)},
+        # tickers whose bars couldn't be brought up to date
+        'stale': stale,
+    }
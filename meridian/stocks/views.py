@@ -1,22 +1,29 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_POST
+import asyncio
 import random
-import json, yfinance as yf
-
-from .models import Holding, Transaction
+import re
+import json
+from datetime import date
+from decimal import Decimal
+
+from . import (candles, charts, history_store, market_data, perf, quotes, replay, resilience,
+               story, streaming, symbols, trading, upstream, valuation)
+from .models import Position, Transaction, WatchlistItem
 from login.models import Profile
-from django.db.models import Sum
-from django.conf import settings
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
 
 
 @login_required
 def api_simulate(request, ticker):
     """Returns a slightly randomized price for demo purposes."""
     try:
-        stock = yf.Ticker(ticker.upper())
-        hist = stock.history(period='1d')
+        hist = market_data.get_history(ticker, period='1d')
         base_price = round(hist['Close'].iloc[-1], 2)
         
         # Random walk: ±0.5% per tick
@@ -33,7 +40,44 @@ def api_simulate(request, ticker):
         })
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
-    
+
+
+@login_required
+async def api_stream(request, ticker):
+    """
+    Server-sent events with a simulated live price; replaces api_simulate
+    polling. Only served under ASGI: a WSGI server drains an async stream
+    before sending anything, so there the client gets 204 No Content, which
+    stops EventSource and makes the page fall back to polling.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    async def events():
+        async for tick in streaming.subscribe(ticker):
+            yield f'data: {json.dumps(tick)}\n\n'
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@staff_member_required
+def api_market_data_stats(request):
+    """Cache counters for quotes, daily bars and candles, plus upstream circuit breaker states."""
+    return JsonResponse({
+        'quotes': market_data.stats(),
+        'bars': history_store.stats(),
+        'candles': candles.stats(),
+        'breakers': resilience.stats(),
+    })
+
+
+@staff_member_required
+def api_perf_stats(request):
+    """Rolling latency histograms and DB/upstream breakdown per URL name."""
+    return JsonResponse({'window_seconds': perf.WINDOW_SECONDS, 'views': perf.stats()})
 
 
 @login_required
@@ -48,48 +92,61 @@ def stock_view(request, ticker):
 def portfolio_view(request):
     return render(request, 'stocks/portfolio.html')
 
+def _best_and_worst_sells(ledger):
+    """
+    One pass over a user's ledger (oldest first), tracking a running average
+    cost per ticker. Returns (best, worst) as (sell, realized gain) pairs.
+    """
+    held = {}  # ticker -> [shares, cost]
+    best = worst = None
+    for t in ledger:
+        shares, cost = held.get(t.ticker, (0, 0))
+        price = float(t.price)
+        if t.action == Transaction.BUY:
+            held[t.ticker] = (shares + t.shares, cost + t.shares * price)
+            continue
+        if shares <= 0:
+            continue
+        avg_cost = cost / shares
+        gain = round((price - avg_cost) * t.shares, 2)
+        remaining = max(shares - t.shares, 0)
+        held[t.ticker] = (remaining, avg_cost * remaining)
+        if best is None or gain > best[1]:
+            best = (t, gain)
+        if worst is None or gain < worst[1]:
+            worst = (t, gain)
+    return best, worst
+
+
 @login_required
 def transactions_view(request):
-    txns = Transaction.objects.filter(user=request.user).order_by('-created_at')[:50]
-    profile = Profile.objects.get(user=request.user)
-    
-    # Calculate summary stats
-    total_spent = sum(t.total for t in txns if t.action == 'BUY')
-    total_received = sum(t.total for t in txns if t.action == 'SELL')
-    net = round(total_received - total_spent, 2)
-    total_trades = txns.count()
-    buy_count = sum(1 for t in txns if t.action == 'BUY')
-    sell_count = sum(1 for t in txns if t.action == 'SELL')
+    user_txns = Transaction.objects.filter(user=request.user)
+    txns = user_txns.order_by('-created_at')[:50]
+
+    # Calculate summary stats in the database
+    summary = user_txns.aggregate(
+        total_spent=Coalesce(Sum('total', filter=Q(action=Transaction.BUY)), Decimal(0)),
+        total_received=Coalesce(Sum('total', filter=Q(action=Transaction.SELL)), Decimal(0)),
+        buy_count=Count('id', filter=Q(action=Transaction.BUY)),
+        sell_count=Count('id', filter=Q(action=Transaction.SELL)),
+    )
+    total_spent = summary['total_spent']
+    total_received = summary['total_received']
+    net = total_received - total_spent
 
     # Best and worst single trade
-    sell_txns = [t for t in txns if t.action == 'SELL']
-    best_trade = None
-    worst_trade = None
-
-    if sell_txns:
-        # For each sell, find the avg buy price for that ticker to compute gain
-        trade_gains = []
-        for t in sell_txns:
-            buys = Transaction.objects.filter(
-                user=request.user, ticker=t.ticker, action='BUY',
-                created_at__lte=t.created_at
-            )
-            if buys.exists():
-                avg_buy = sum(b.price for b in buys) / buys.count()
-                gain = round((t.price - avg_buy) * t.shares, 2)
-                trade_gains.append((t, gain))
-        if trade_gains:
-            best_trade = max(trade_gains, key=lambda x: x[1])
-            worst_trade = min(trade_gains, key=lambda x: x[1])
+    ledger = (user_txns.order_by('created_at', 'id')
+              .only('ticker', 'action', 'shares', 'price', 'created_at'))
+    best_trade, worst_trade = _best_and_worst_sells(ledger.iterator())
 
     context = {
         'transactions': txns,
-        'total_spent': round(total_spent, 2),
-        'total_received': round(total_received, 2),
+        'total_spent': total_spent,
+        'total_received': total_received,
         'net': net,
-        'total_trades': total_trades,
-        'buy_count': buy_count,
-        'sell_count': sell_count,
+        'total_trades': summary['buy_count'] + summary['sell_count'],
+        'buy_count': summary['buy_count'],
+        'sell_count': summary['sell_count'],
         'best_trade': best_trade,
         'worst_trade': worst_trade,
     }
@@ -98,180 +155,218 @@ def transactions_view(request):
 
 # ── API endpoints ──────────────────────────────────────
 
+# api_stock key -> (yfinance info key, default); 'name' falls back to the ticker
+INFO_FIELDS = {
+    'sector': ('sector', 'N/A'),
+    'market_cap': ('marketCap', None),
+    'description': ('longBusinessSummary', ''),
+    'week_52_high': ('fiftyTwoWeekHigh', None),
+    'week_52_low': ('fiftyTwoWeekLow', None),
+    'volume': ('volume', None),
+    'avg_volume': ('averageVolume', None),
+    'day_high': ('dayHigh', None),
+    'day_low': ('dayLow', None),
+    'pe_ratio': ('trailingPE', None),
+    'dividend_yield': ('dividendYield', None),
+    'employees': ('fullTimeEmployees', None),
+    'website': ('website', ''),
+    'exchange': ('exchange', ''),
+}
+
+
 @login_required
-def api_stock(request, ticker):
+async def api_stock(request, ticker):
+    """
+    Price, chart and company details for one ticker.
+
+    ``?fields=`` limits the response to those keys, and the slow company
+    info lookup is skipped unless one of them needs it. ``?points=`` thins
+    the chart to that many points (LTTB), and ``?format=columns`` sends it
+    as parallel ``dates``/``close`` arrays instead of one object per bar.
+    """
+    points = request.GET.get('points') or '0'
+    if not points.isdecimal():
+        return JsonResponse({'error': 'points must be a whole number'}, status=400)
+    points = int(points)
     try:
         ticker = ticker.upper()
         period = request.GET.get('period', '3mo')
-        stock = yf.Ticker(ticker)
-        history = stock.history(period=period)
-        if history.empty:
+        fields = {f.strip() for f in request.GET.get('fields', '').split(',') if f.strip()}
+        columnar = request.GET.get('format') == 'columns'
+
+        def want(key):
+            return not fields or key in fields
+        want_info = want('name') or any(want(key) for key in INFO_FIELDS)
+
+        # chart bars and company info are independent, so fetch them together
+        calls = [upstream.call(charts.close_history, ticker, period, db=True)]
+        if want_info:
+            calls.append(upstream.call(market_data.get_info, ticker))
+        (dates, closes), *info = await asyncio.gather(*calls)
+        info = info[0] if info else {}
+        if not len(closes):
             return JsonResponse({'error': 'Not found'}, status=404)
-        info = stock.info
-        data = [{'date': str(d.date()), 'close': round(r['Close'], 2)}
-                for d, r in history.iterrows()]
-        current = data[-1]['close']
-        prev = data[-2]['close'] if len(data) > 1 else current
+
+        current = float(closes[-1])
+        prev = float(closes[-2]) if len(closes) > 1 else current
         change = round(current - prev, 2)
-        change_pct = round((change / prev) * 100, 2) if prev else 0
-        return JsonResponse({
+        data = {
             'ticker': ticker,
             'name': info.get('longName', ticker),
             'current_price': current,
             'change': change,
-            'change_pct': change_pct,
-            'sector': info.get('sector', 'N/A'),
-            'market_cap': info.get('marketCap'),
-            'history': data,
-            'description': info.get('longBusinessSummary', ''),
-            'week_52_high': info.get('fiftyTwoWeekHigh'),
-            'week_52_low': info.get('fiftyTwoWeekLow'),
-            'volume': info.get('volume'),
-            'avg_volume': info.get('averageVolume'),
-            'day_high': info.get('dayHigh'),
-            'day_low': info.get('dayLow'),
-            'pe_ratio': info.get('trailingPE'),
-            'dividend_yield': info.get('dividendYield'),
-            'employees': info.get('fullTimeEmployees'),
-            'website': info.get('website', ''),
-            'exchange': info.get('exchange', ''),
-        })
+            'change_pct': round((change / prev) * 100, 2) if prev else 0,
+            **{key: info.get(source, default) for key, (source, default) in INFO_FIELDS.items()},
+        }
+        if want('history'):
+            if points:
+                keep = charts.lttb(closes, points)
+                dates, closes = dates[keep], closes[keep]
+            dates, closes = dates.tolist(), closes.tolist()
+            data['history'] = ({'dates': dates, 'close': closes} if columnar else
+                               [{'date': d, 'close': c} for d, c in zip(dates, closes)])
+        return JsonResponse({k: v for k, v in data.items() if k == 'ticker' or want(k)})
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
-# dict to map company name to their ticker for search bar
-COMPANY_NAME_MAP = {
-    'apple': 'AAPL',
-    'microsoft': 'MSFT',
-    'google': 'GOOGL',
-    'alphabet': 'GOOGL',
-    'amazon': 'AMZN',
-    'tesla': 'TSLA',
-    'nvidia': 'NVDA',
-    'meta': 'META',
-    'facebook': 'META',
-    'netflix': 'NFLX',
-    'spotify': 'SPOT',
-    'uber': 'UBER',
-    'lyft': 'LYFT',
-    'airbnb': 'ABNB',
-    'paypal': 'PYPL',
-    'visa': 'V',
-    'mastercard': 'MA',
-    'jpmorgan': 'JPM',
-    'jp morgan': 'JPM',
-    'goldman sachs': 'GS',
-    'bank of america': 'BAC',
-    'disney': 'DIS',
-    'walmart': 'WMT',
-    'target': 'TGT',
-    'nike': 'NKE',
-    'coca cola': 'KO',
-    'cocacola': 'KO',
-    'pepsi': 'PEP',
-    'pepsico': 'PEP',
-    'mcdonalds': 'MCD',
-    "mcdonald's": 'MCD',
-    'starbucks': 'SBUX',
-    'intel': 'INTC',
-    'amd': 'AMD',
-    'advanced micro devices': 'AMD',
-    'qualcomm': 'QCOM',
-    'salesforce': 'CRM',
-    'oracle': 'ORCL',
-    'adobe': 'ADBE',
-    'zoom': 'ZM',
-    'shopify': 'SHOP',
-    'twitter': 'TWTR',
-    'snapchat': 'SNAP',
-    'snap': 'SNAP',
-    'coinbase': 'COIN',
-    'robinhood': 'HOOD',
-    'palantir': 'PLTR',
-    'spy': 'SPY',
-    's&p 500': 'SPY',
-    'sp500': 'SPY',
-    'boeing': 'BA',
-    'ford': 'F',
-    'gm': 'GM',
-    'general motors': 'GM',
-    'exxon': 'XOM',
-    'chevron': 'CVX',
-    'johnson and johnson': 'JNJ',
-    'johnson & johnson': 'JNJ',
-    'pfizer': 'PFE',
-    'moderna': 'MRNA',
-    'at&t': 'T',
-    'att': 'T',
-    'verizon': 'VZ',
-    'comcast': 'CMCSA',
-    'berkshire': 'BRK-B',
-    'berkshire hathaway': 'BRK-B',
-}
 
 @login_required
-def api_search(request, query):
+async def api_candles(request, ticker):
+    """
+    OHLCV candles as parallel arrays. ``?resolution=`` is one of
+    candles.RESOLUTIONS; without it the finest one that fits ``?points=``
+    candles between ``?start=`` and ``?end=`` (ISO dates) is picked.
+    API-only for now: the stock page chart still uses api_stock.
+    """
+    resolution = request.GET.get('resolution') or None
+    if resolution is not None and resolution not in candles.RESOLUTIONS:
+        choices = ', '.join(candles.RESOLUTIONS)
+        return JsonResponse({'error': f'resolution must be one of {choices}'}, status=400)
+    try:
+        start, end = (date.fromisoformat(request.GET[key]) if request.GET.get(key) else None
+                      for key in ('start', 'end'))
+    except ValueError:
+        return JsonResponse({'error': 'start and end must be dates like 2024-01-31'}, status=400)
+    points = request.GET.get('points') or str(candles.DEFAULT_MAX_POINTS)
+    if not points.isdecimal() or int(points) < 1:
+        return JsonResponse({'error': 'points must be a positive whole number'}, status=400)
     try:
-        # First check if the query matches a company name
-        normalized = query.lower().strip()
-        ticker = COMPANY_NAME_MAP.get(normalized, query.upper())
+        resolution, frame = await upstream.call(
+            candles.get_candles, ticker, resolution,
+            start=start, end=end, max_points=int(points), db=True,
+        )
+        if frame.empty:
+            return JsonResponse({'error': 'Not found'}, status=404)
+        fmt = '%Y-%m-%dT%H:%M' if resolution == '1h' else '%Y-%m-%d'
+        return JsonResponse({
+            'ticker': ticker.upper(),
+            'resolution': resolution,
+            'time': frame.index.strftime(fmt).tolist(),
+            **{col.lower(): frame[col].round(2).tolist() for col in ('Open', 'High', 'Low', 'Close')},
+            'volume': frame['Volume'].astype('int64').tolist(),
+        })
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
 
-        stock = yf.Ticker(ticker)
-        history = stock.history(period='5d')
-        info = stock.info
 
-        if history.empty or not info.get('longName'):
+@login_required
+async def api_search(request, query):
+    try:
+        # Rank candidates from the in-process symbol index (no network)
+        candidates = symbols.search(query)
+        raw = query.strip().upper()
+        if not candidates and re.fullmatch(r'[A-Z.\-]{1,10}', raw):
+            candidates = [(raw, raw)]  # unlisted symbol: let the price lookup decide
+        if not candidates:
             return JsonResponse({'error': 'Not found'}, status=404)
 
-        current = round(history['Close'].iloc[-1], 2)
-        prev = round(history['Close'].iloc[-2], 2) if len(history) > 1 else current
-        change_pct = round(((current - prev) / prev) * 100, 2)
+        # then price every candidate in one batched lookup
+        results = await upstream.call(
+            quotes.get_quotes, [t for t, _ in candidates], names=dict(candidates))
+        if not results:
+            return JsonResponse({'error': 'Not found'}, status=404)
 
-        return JsonResponse({
-            'ticker': ticker,
-            'name': info.get('longName'),
-            'current_price': current,
-            'change_pct': change_pct,
-        })
+        # best match stays at the top level for existing callers
+        return JsonResponse({**results[0], 'results': results})
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
     
 
+@login_required
+def api_quotes(request):
+    """
+    Name, price and day change for ``?tickers=AAPL,TSLA,...`` from one
+    batched lookup. Without ``tickers`` it quotes the user's watchlist, or
+    the default popular list while the watchlist is empty.
+    """
+    if 'tickers' in request.GET:
+        tickers, watchlist = quotes.parse_tickers(request.GET['tickers']), False
+    else:
+        tickers = list(request.user.watchlist.values_list('ticker', flat=True))
+        watchlist = bool(tickers)
+        tickers = tickers or quotes.DEFAULT_WATCHLIST
+    try:
+        results = quotes.get_quotes(tickers) if tickers else []
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+    return JsonResponse({'watchlist': watchlist, 'quotes': results})
+
+@login_required
+def api_watchlist(request):
+    return JsonResponse({'tickers': list(request.user.watchlist.values_list('ticker', flat=True))})
+
+@login_required
+@require_POST
+def api_watchlist_add(request):
+    ticker = json.loads(request.body)['ticker'].upper()
+    if not quotes.TICKER_RE.fullmatch(ticker):
+        return JsonResponse({'error': 'Invalid ticker'}, status=400)
+    WatchlistItem.objects.get_or_create(user=request.user, ticker=ticker)
+    return JsonResponse({'success': True, 'ticker': ticker})
+
+@login_required
+@require_POST
+def api_watchlist_remove(request):
+    ticker = json.loads(request.body)['ticker'].upper()
+    WatchlistItem.objects.filter(user=request.user, ticker=ticker).delete()
+    return JsonResponse({'success': True, 'ticker': ticker})
+
 @login_required
 def api_portfolio(request):
     profile = Profile.objects.get(user=request.user)
-    holdings_qs = (Holding.objects
-                   .filter(user=request.user)
-                   .values('ticker')
-                   .annotate(total_shares=Sum('shares')))
+    open_positions = list(Position.objects.filter(user=request.user, shares__gt=0))
+    tickers = [p.ticker for p in open_positions]
+    # one batched upstream fetch for every ticker held; while upstream is
+    # failing, the last prices seen (cached, then stored bars) stand in
+    closes, stale = market_data.get_closes_or_stale(tickers, period='2d')
+    prices = {t: round(float(closes[t].dropna().iloc[-1]), 2)
+              for t in closes if closes[t].notna().any()}
+    missing = [t for t in tickers if t not in prices]
+    if missing:
+        stored = history_store.last_closes(missing)
+        prices.update({t: round(c, 2) for t, c in stored.items()})
+        stale |= set(stored)
     holdings = []
     total_invested = 0
-    for h in holdings_qs:
-        if h['total_shares'] <= 0:
-            continue
-        try:
-            hist = yf.Ticker(h['ticker']).history(period='2d')
-            current_price = round(hist['Close'].iloc[-1], 2)
-        except:
-            current_price = 0
-        avg_price = Holding.objects.filter(user=request.user, ticker=h['ticker']).aggregate(avg=Sum('buy_price'))
-        # compute weighted avg
-        all_lots = Holding.objects.filter(user=request.user, ticker=h['ticker'])
-        weighted = sum(l.shares * l.buy_price for l in all_lots) / h['total_shares']
-        market_value = round(current_price * h['total_shares'], 2)
-        cost_basis = round(weighted * h['total_shares'], 2)
+    for p in open_positions:
+        current_price = prices.get(p.ticker)
+        weighted = p.avg_price
+        cost_basis = round(p.cost_basis, 2)
+        # with no price at all, carry the position at cost rather than at zero
+        market_value = round(current_price * p.shares, 2) if current_price is not None else cost_basis
         gain_loss = round(market_value - cost_basis, 2)
         gain_loss_pct = round((gain_loss / cost_basis) * 100, 2) if cost_basis else 0
         total_invested += market_value
         holdings.append({
-            'ticker': h['ticker'],
-            'shares': h['total_shares'],
+            'ticker': p.ticker,
+            'shares': p.shares,
             'avg_price': round(weighted, 2),
             'current_price': current_price,
             'market_value': market_value,
             'cost_basis': cost_basis,
             'gain_loss': gain_loss,
             'gain_loss_pct': gain_loss_pct,
+            'stale': p.ticker in stale or current_price is None,
         })
     total_value = round(profile.balance + total_invested, 2)
     overall_gain = round(total_value - 100000, 2)
@@ -282,6 +377,7 @@ def api_portfolio(request):
         'overall_gain': overall_gain,
         'overall_gain_pct': round((overall_gain / 100000) * 100, 2),
         'holdings': holdings,
+        'stale': any(h['stale'] for h in holdings),
     })
 
 @login_required
@@ -291,14 +387,10 @@ def api_buy(request):
     ticker = data['ticker'].upper()
     shares = float(data['shares'])
     price = float(data['price'])
-    total = shares * price
-    profile = Profile.objects.get(user=request.user)
-    if profile.balance < total:
-        return JsonResponse({'error': 'Insufficient funds'}, status=400)
-    profile.balance -= total
-    profile.save()
-    Holding.objects.create(user=request.user, ticker=ticker, shares=shares, buy_price=price)
-    Transaction.objects.create(user=request.user, ticker=ticker, action='BUY', shares=shares, price=price, total=total)
+    try:
+        trading.buy(request.user, ticker, shares, price)
+    except trading.TradeError as e:
+        return JsonResponse({'error': str(e)}, status=400)
     return JsonResponse({'success': True, 'message': f'Bought {shares} shares of {ticker} at ${price:.2f}'})
 
 @login_required
@@ -308,15 +400,10 @@ def api_sell(request):
     ticker = data['ticker'].upper()
     shares = float(data['shares'])
     price = float(data['price'])
-    total_shares = Holding.objects.filter(user=request.user, ticker=ticker).aggregate(s=Sum('shares'))['s'] or 0
-    if total_shares < shares:
-        return JsonResponse({'error': 'Not enough shares'}, status=400)
-    total = shares * price
-    profile = Profile.objects.get(user=request.user)
-    profile.balance += total
-    profile.save()
-    Holding.objects.create(user=request.user, ticker=ticker, shares=-shares, buy_price=price)
-    Transaction.objects.create(user=request.user, ticker=ticker, action='SELL', shares=shares, price=price, total=total)
+    try:
+        trading.sell(request.user, ticker, shares, price)
+    except trading.TradeError as e:
+        return JsonResponse({'error': str(e)}, status=400)
     return JsonResponse({'success': True, 'message': f'Sold {shares} shares of {ticker} at ${price:.2f}'})
 
 @login_required
@@ -328,44 +415,49 @@ def api_user(request):
 @login_required
 def api_timetravel(request):
     """
-    Given a date offset (days ago), return what each holding would be worth
-    at that point in time using real historical data.
+    Given a date offset (days ago), return what the portfolio held on that
+    date was worth then, against what is held now, using real historical data.
     """
     days_ago = int(request.GET.get('days', 0))
     from datetime import datetime, timedelta
-    import pandas as pd
     
     target_date = datetime.now() - timedelta(days=days_ago)
     
-    conn_holdings = Holding.objects.filter(user=request.user).values('ticker').annotate(total_shares=Sum('shares'))
-    
+    # Shares as of the target date come from replaying the trade ledger
+    ledger = replay.for_user(request.user.pk)
+    shares_then = ledger.shares_on(target_date.date())
+    shares_now = {t: s for t, s in ledger.holdings.items() if s > 1e-9}
+    tickers = sorted(set(shares_then) | set(shares_now))
+
+    # Stored daily bars for every ticker, topped up in one batch
+    try:
+        series = history_store.get_many(tickers)
+    except Exception:
+        series = {}
+
     results = []
+    unavailable = []
     total_then = 0
     total_now = 0
     
-    for h in conn_holdings:
-        if h['total_shares'] <= 0:
-            continue
+    for ticker in tickers:
         try:
-            stock = yf.Ticker(h['ticker'])
-            # Pull enough history to cover the range
-            history = stock.history(period='1y')
-            if history.empty:
+            bars = series.get(ticker)
+            if not bars:
+                unavailable.append(ticker)
                 continue
-            
+
             # Get price at target date (closest trading day)
-            history.index = history.index.tz_localize(None)
-            past = history[history.index <= target_date]
-            now = history
+            past_close = bars.close_on_or_before(target_date.date())
             
-            if past.empty:
-                continue
+            if past_close is None:
+                continue  # not listed yet on that date
                 
-            price_then = round(float(past['Close'].iloc[-1]), 2)
-            price_now = round(float(now['Close'].iloc[-1]), 2)
-            shares = h['total_shares']
+            price_then = round(float(past_close), 2)
+            price_now = round(float(bars.last_close), 2)
+            shares = shares_then.get(ticker, 0)
             value_then = round(price_then * shares, 2)
-            value_now = round(price_now * shares, 2)
+            value_now = round(price_now * shares_now.get(ticker, 0), 2)
             gain = round(value_now - value_then, 2)
             gain_pct = round((gain / value_then) * 100, 2) if value_then else 0
             
@@ -373,17 +465,19 @@ def api_timetravel(request):
             total_now += value_now
             
             results.append({
-                'ticker': h['ticker'],
+                'ticker': ticker,
                 'shares': shares,
+                'shares_now': shares_now.get(ticker, 0),
                 'price_then': price_then,
                 'price_now': price_now,
                 'value_then': value_then,
                 'value_now': value_now,
                 'gain': gain,
                 'gain_pct': gain_pct,
+                'stale': bars.stale,
             })
-        except Exception as e:
-            continue
+        except Exception:
+            unavailable.append(ticker)
     
     total_gain = round(total_now - total_then, 2)
     total_gain_pct = round((total_gain / total_then) * 100, 2) if total_then else 0
@@ -396,53 +490,75 @@ def api_timetravel(request):
         'total_gain': total_gain,
         'total_gain_pct': total_gain_pct,
         'holdings': results,
+        # stale: some prices are from stored bars that couldn't be updated;
+        # unavailable: tickers with no price data at all
+        'stale': any(h['stale'] for h in results) or bool(unavailable),
+        'unavailable': unavailable,
     })
 
+def _price_move(ticker, days):
+    from datetime import datetime, timedelta
+    bars = history_store.get_series(ticker)
+    target = datetime.now() - timedelta(days=days)
+    past_close = bars.close_on_or_before(target.date())
+    price_then = round(float(past_close), 2) if past_close is not None else None
+    price_now = round(float(bars.last_close), 2)
+    return price_then, price_now
+
+
+@login_required
+def api_timetravel_curve(request):
+    """
+    The whole daily value-over-time curve for the user's portfolio (plus
+    each ticker's price and share-count series), so the time machine slider
+    can be scrubbed on the client without further requests.
+    """
+    requested = request.GET.get('days') or '365'
+    if not requested.isdecimal():
+        return JsonResponse({'error': 'days must be a whole number'}, status=400)
+    days = min(int(requested), valuation.MAX_DAYS)
+    try:
+        curve = valuation.value_curve(replay.for_user(request.user.pk), days=days)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+    # asked for more history than the bar store keeps
+    return JsonResponse({'days': days, 'truncated': days < int(requested), **curve})
+
 # to get real life articles as to what might have happened to a stock over a given time period
 # and use Gemini to explain the move in simple terms
-@login_required  
-def api_stock_story(request, ticker):
+@login_required
+async def api_stock_story(request, ticker):
     """
     Returns real news headlines + a Gemini-powered explanation
     of why a stock moved over a given time period.
     """
     days = int(request.GET.get('days', 30))
-    
-    # ── Pull real news from Yahoo Finance ──────────────────────────
-    try:
-        import requests as req
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        news_url = f'https://query2.finance.yahoo.com/v1/finance/search?q={ticker}&quotesCount=0&newsCount=5'
-        news_res = req.get(news_url, headers=headers, timeout=5)
-        news_data = news_res.json()
-        articles = news_data.get('news', [])
-        headlines = [a.get('title', '') for a in articles if a.get('title')][:5]
-    except:
-        headlines = []
 
-    # ── Get price change data ──────────────────────────────────────
-    try:
-        from datetime import datetime, timedelta
-        stock = yf.Ticker(ticker)
-        history = stock.history(period='1y')
-        history.index = history.index.tz_localize(None)
-        target = datetime.now() - timedelta(days=days)
-        past = history[history.index <= target]
-        price_then = round(float(past['Close'].iloc[-1]), 2) if not past.empty else None
-        price_now = round(float(history['Close'].iloc[-1]), 2)
-        info = stock.info
+    # ── Pull news, price change and company info concurrently ─────
+    articles, move, info = await asyncio.gather(
+        upstream.call(upstream.fetch_news, ticker, timeout=upstream.NEWS_TIMEOUT),
+        upstream.call(_price_move, ticker, days, db=True),
+        upstream.call(market_data.get_info, ticker),
+        return_exceptions=True,
+    )
+    if isinstance(articles, BaseException):
+        articles = []
+    headlines = [a['title'] for a in articles]
+
+    if isinstance(move, BaseException):
+        price_then, price_now = None, None
+    else:
+        price_then, price_now = move
+
+    if isinstance(info, BaseException):
+        company_name, sector = ticker, ''
+    else:
         company_name = info.get('longName', ticker)
         sector = info.get('sector', '')
-    except:
-        price_then = None
-        price_now = None
-        company_name = ticker
-        sector = ''
 
     # ── Ask Gemini to explain the move ────────────────────────────
     ai_summary = None
     try:
-        import requests as req
         change_str = ''
         if price_then and price_now:
             change = round(price_now - price_then, 2)
@@ -462,13 +578,7 @@ Recent headlines:
 
 In 2-3 short, plain-English sentences, explain to a beginner WHY this stock likely moved the way it did over this period. Reference the headlines if relevant. Be specific but avoid jargon. Do not use bullet points."""
 
-        gemini_res = req.post(
-            f'https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent?key={settings.GEMINI_API_KEY}',
-            json={'contents': [{'parts': [{'text': prompt}]}]},
-            timeout=10
-        )
-        gemini_data = gemini_res.json()
-        ai_summary = gemini_data['candidates'][0]['content']['parts'][0]['text']
+        ai_summary = await story.get_summary(ticker, days, headlines, prompt)
     except:
         ai_summary = None
 
@@ -478,4 +588,4 @@ In 2-3 short, plain-English sentences, explain to a beginner WHY this stock like
         'ai_summary': ai_summary,
         'price_then': price_then,
         'price_now': price_now,
-    })
\ No newline at end of file
+    })